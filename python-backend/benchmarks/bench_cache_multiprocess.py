@@ -0,0 +1,100 @@
+"""
+Test de charge : plusieurs processus écrivent, lisent et suppriment en même temps dans le même
+cache_dir (backends json et sqlite). Vérifie ensuite depuis un processus neuf qu'aucune entrée
+n'a été perdue ni tronquée, et affiche le débit de chaque backend.
+
+Utilisation :
+    python python-backend/benchmarks/bench_cache_multiprocess.py [processus] [écritures_par_processus]
+"""
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cache_manager import CacheManager
+
+SHARED_KEYS = 8
+
+
+def cache_config(backend, cache_dir):
+    # CacheManager n'utilise que config_manager.get(section, défaut) : un dict suffit
+    return {"cache": {"cache_dir": cache_dir, "backend": backend, "max_cache_size": 1 << 30,
+                      "access_flush_threshold": 16, "lock_timeout": 30.0}}
+
+
+def payload(worker, index):
+    return {"worker": worker, "index": index,
+            "achievements": {f"ACH_{i}": {"percentage": i * 0.5, "displayName": f"Achievement {i}"}
+                             for i in range(40)}}
+
+
+def worker_main(backend, cache_dir, worker, writes, start_event):
+    cache = CacheManager(cache_config(backend, cache_dir))
+    start_event.wait()
+    for index in range(writes):
+        cache.set_cache("achievements", f"w{worker}_{index}", payload(worker, index))
+        # Clés partagées : tous les processus les réécrivent et les lisent
+        cache.set_cache("games", f"shared_{index % SHARED_KEYS}", payload(worker, index))
+        cache.get_cache("games", f"shared_{(index + worker) % SHARED_KEYS}")
+        if index % 10 == 9:
+            # Entrées éphémères créées puis supprimées
+            cache.set_cache("steam_store", f"tmp_w{worker}_{index}", payload(worker, index))
+            cache.invalidate_cache("steam_store", f"tmp_w{worker}_{index}")
+    cache.flush_accesses()
+
+
+def check(backend, cache_dir, workers, writes):
+    cache = CacheManager(cache_config(backend, cache_dir))
+    cache.memory.clear()
+    missing = [f"w{worker}_{index}" for worker in range(workers) for index in range(writes)
+               if cache.get_cache("achievements", f"w{worker}_{index}") != payload(worker, index)]
+    shared = [cache.get_cache("games", f"shared_{i}") for i in range(SHARED_KEYS)]
+    leftovers = cache.backend.stats().get("steam_store", (0, 0))[0]
+
+    assert not missing, f"{len(missing)} entrées perdues ou corrompues, ex. {missing[:5]}"
+    assert all(entry is not None for entry in shared), "clé partagée perdue"
+    assert leftovers == 0, f"{leftovers} entrées supprimées encore indexées"
+    if backend == "json":
+        with open(Path(cache_dir) / "cache_metadata.json", encoding="utf-8") as f:
+            json.load(f)
+        stray = list(Path(cache_dir).rglob("*.tmp"))
+        assert not stray, f"fichiers temporaires restants : {stray[:5]}"
+
+
+def run(backend, workers, writes):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        CacheManager(cache_config(backend, cache_dir)).backend.close()
+        start_event = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=worker_main, args=(backend, cache_dir, worker, writes, start_event))
+                     for worker in range(workers)]
+        for process in processes:
+            process.start()
+        time.sleep(0.5)  # laisse les processus ouvrir le cache
+
+        start = time.perf_counter()
+        start_event.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        assert all(process.exitcode == 0 for process in processes), "un processus a échoué"
+        check(backend, cache_dir, workers, writes)
+        operations = workers * writes * 2 + workers * (writes // 10) * 2
+        print(f"{backend:6s}: {workers} processus x {writes} écritures - {elapsed:.2f} s "
+              f"({operations / elapsed:.0f} écritures/s), aucune perte")
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    for backend in ("json", "sqlite"):
+        run(backend, workers, writes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark : parseur INI streaming (parse_ini_fast) vs configparser sur un achievements.ini synthétique.
+Vérifie aussi que les deux chemins produisent exactement le même résultat.
+
+Utilisation :
+    python python-backend/benchmarks/bench_ini_parser.py [nombre_de_sections]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from local_achievements import LocalAchievementFile, parse_ini_fast, parse_ini_configparser
+
+
+def write_sample_ini(path, sections):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"[SteamAchievements]\nCount={sections // 2}\n")
+        for i in range(sections // 2):
+            f.write(f"{i:05d}=ACH_{i}\n")
+        for i in range(sections):
+            f.write(f"\n[ACH_{i}]\nAchieved={i % 2}\nCurProgress=0\nMaxProgress=0\nUnlockTime={1600000000 + i}\n")
+
+
+def run(parse, path, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        result = LocalAchievementFile(path=path, format='ini')
+        start = time.perf_counter()
+        parse(path, result)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'achievements.ini')
+        write_sample_ini(path, sections)
+
+        fast_time, fast = run(parse_ini_fast, path, repeat=5)
+        reference_time, reference = run(parse_ini_configparser, path, repeat=5)
+
+    assert fast == reference, "parse_ini_fast diverges from configparser"
+    print(f"{sections} sections, {len(fast.unlocks)} entries")
+    print(f"  configparser   : {reference_time * 1000:8.2f} ms")
+    print(f"  parse_ini_fast : {fast_time * 1000:8.2f} ms  (x{reference_time / fast_time:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark : requêtes de LibraryAnalytics sur une bibliothèque synthétique (300 jeux, ~50k succès).
+Mesure la construction de la table puis chaque requête (rarest / completion / timeline),
+avec NumPy si installé, sinon les colonnes array.
+
+Utilisation :
+    python python-backend/benchmarks/bench_library_analytics.py [jeux] [succès_par_jeu]
+"""
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import library_analytics
+from library_analytics import AchievementTable
+
+
+def synthetic_library(games, per_game, seed=42):
+    rng = random.Random(seed)
+    teams = ['CODEX', 'RUNE', 'EMPRESS', 'SKIDROW', 'Goldberg SteamEmu Saves']
+    game_rows = []
+    segments = []
+    for index in range(games):
+        game_rows.append({'app_id': str(100000 + index), 'name': f"Game {index}",
+                          'team': teams[index % len(teams)], 'location': f"location_{index % 3}"})
+        unlocked = array('b', (rng.random() < 0.4 for _ in range(per_game)))
+        segments.append({
+            'keys': [f"ACH_{i}" for i in range(per_game)],
+            'names': [f"Achievement {i}" for i in range(per_game)],
+            'percentage': array('d', (rng.random() * 100 for _ in range(per_game))),
+            'unlocked': unlocked,
+            'unlock_time': array('q', (1500000000 + rng.randrange(200000000) if flag else 0 for flag in unlocked))
+        })
+    return game_rows, segments
+
+
+def best_of(function, repeat=200):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    per_game = int(sys.argv[2]) if len(sys.argv) > 2 else 170
+    game_rows, segments = synthetic_library(games, per_game)
+
+    start = time.perf_counter()
+    table = AchievementTable(game_rows, segments)
+    build_time = time.perf_counter() - start
+
+    backend = 'numpy' if library_analytics.np is not None else 'array'
+    print(f"{games} jeux, {len(table)} succès ({backend}) - construction : {build_time * 1000:.1f} ms")
+
+    # Parité : le plus rare débloqué est bien le minimum des pourcentages débloqués
+    expected = min(p for segment in segments for p, u in zip(segment['percentage'], segment['unlocked']) if u)
+    assert table.rarest_unlocked(1)[0]['percentage'] == expected
+    assert sum(entry['count'] for entry in table.timeline('day')) == len(table.unlock_times_sorted)
+
+    queries = {
+        'overview': table.overview,
+        'rarest_unlocked(10)': lambda: table.rarest_unlocked(10),
+        'completion_by(team)': lambda: table.completion_by('team'),
+        'completion_by(location)': lambda: table.completion_by('location'),
+        'timeline(month)': lambda: table.timeline('month'),
+        'timeline(week)': lambda: table.timeline('week'),
+    }
+    for name, query in queries.items():
+        print(f"  {name:24s}: {best_of(query) * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
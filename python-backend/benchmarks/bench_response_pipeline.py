@@ -0,0 +1,122 @@
+"""
+Benchmark : sérialisation et compression des réponses JSON sur une bibliothèque synthétique
+(300 jeux, 20k succès au format de /api/achievements:batch, plus la liste /api/games).
+Compare l'encodeur par défaut de Flask (json trié, ASCII) à encode_json (orjson si installé),
+puis les octets envoyés : brut, gzip (niveaux 1 et 6), brotli (si installé) et flux gzip (iter_json_document).
+
+Utilisation :
+    python python-backend/benchmarks/bench_response_pipeline.py [jeux] [succès]
+"""
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import response_pipeline
+from response_pipeline import ResponseCompressor, encode_json, iter_json_document
+from game_summary import rarity_level
+
+
+def synthetic_library(games, achievements, seed=42):
+    rng = random.Random(seed)
+    per_game = achievements // games
+    game_list = []
+    batch = []
+    for index in range(games):
+        app_id = str(100000 + index)
+        formatted = []
+        for i in range(per_game):
+            percentage = round(rng.random() * 100, 1)
+            unlocked = rng.random() < 0.4
+            formatted.append({
+                'key': f"ACH_{i}",
+                'name': f"Achievement {i} of game {index}",
+                'description': f"Unlock achievement number {i} — défi n°{i}",
+                'percentage': percentage,
+                'icon': f"https://cdn.steamstatic.com/steamcommunity/public/images/apps/{app_id}/{i:040x}.jpg",
+                'icon_gray': f"https://cdn.steamstatic.com/steamcommunity/public/images/apps/{app_id}/{i:040x}_gray.jpg",
+                'unlocked': unlocked,
+                'unlock_time': 1500000000 + rng.randrange(200000000) if unlocked else None,
+                'rarity': rarity_level(percentage),
+                'source': 'STEAM_API'
+            })
+        unlocked_count = sum(1 for ach in formatted if ach['unlocked'])
+        batch.append({'success': True, 'app_id': app_id, 'stale': False, 'achievements': formatted,
+                      'stats': {'total': per_game, 'unlocked': unlocked_count, 'locked': per_game - unlocked_count,
+                                'completion_percentage': round(unlocked_count / per_game * 100, 1)}})
+        game_list.append({'app_id': app_id, 'name': f"Game {index}", 'path': f"C:\\Games\\CODEX\\{app_id}",
+                          'team': 'CODEX', 'location': 'public_documents', 'local_achievements_count': unlocked_count,
+                          'total_obtenable_achievements': per_game, 'pending': False, 'stale': False,
+                          'has_api_data': False})
+
+    return ({'success': True, 'games': game_list, 'total_games': games, 'pending_games': 0},
+            {'success': True, 'games': batch, 'total_games': games, 'failed_games': 0})
+
+
+def flask_default(obj):
+    """Encodeur par défaut de Flask en production : clés triées, ASCII, séparateurs compacts"""
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def stdlib_compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def best_of(function, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, payload, repeat):
+    print(f"\n{label}")
+    encoders = {'flask (json trié, ASCII)': flask_default, 'json compact UTF-8': stdlib_compact}
+    if response_pipeline.orjson is not None:
+        encoders['encode_json (orjson)'] = encode_json
+    for name, encoder in encoders.items():
+        elapsed, body = best_of(lambda: encoder(payload), repeat)
+        assert json.loads(body) == payload
+        print(f"  {name:30s}: {elapsed * 1000:8.2f} ms  {len(body) / 1024:9.1f} KiB")
+
+    body = encode_json(payload)
+    compressor = ResponseCompressor()
+    for level in (1, 6):
+        elapsed, compressed = best_of(lambda: gzip.compress(body, compresslevel=level, mtime=0), repeat)
+        print(f"  {'gzip -' + str(level):30s}: {elapsed * 1000:8.2f} ms  {len(compressed) / 1024:9.1f} KiB")
+    if response_pipeline.brotli is not None:
+        for quality in (4, 6):
+            elapsed, compressed = best_of(lambda: response_pipeline.brotli.compress(body, quality=quality), repeat)
+            print(f"  {'brotli q' + str(quality):30s}: {elapsed * 1000:8.2f} ms  {len(compressed) / 1024:9.1f} KiB")
+    else:
+        print("  brotli                        : non installé")
+
+    fields = {key: value for key, value in payload.items() if key != 'games'}
+
+    def streamed():
+        return b''.join(compressor.stream(iter_json_document(fields, 'games', payload['games']), 'gzip'))
+
+    elapsed, compressed = best_of(streamed, repeat)
+    assert json.loads(gzip.decompress(compressed)) == payload
+    print(f"  {'flux gzip -1 (encode + compr.)':30s}: {elapsed * 1000:8.2f} ms  {len(compressed) / 1024:9.1f} KiB")
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    achievements = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    games_payload, batch_payload = synthetic_library(games, achievements)
+    print(f"{games} jeux, {achievements} succès")
+
+    report("/api/games", games_payload, repeat=50)
+    report("/api/achievements:batch (tous les jeux)", batch_payload, repeat=5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark : temps de démarrage du backend (main.py) jusqu'à la première réponse.
+Lance le serveur dans un sous-processus et mesure :
+- le temps jusqu'à la première réponse de /api/health (ce qu'attend le shell Electron),
+- puis le temps de la première requête /api/games (création des composants incluse).
+
+Utilisation :
+    python python-backend/benchmarks/bench_startup.py [nombre_de_lancements]
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+BASE_URL = "http://localhost:5000"
+
+
+def wait_for(url, deadline):
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.01)
+    raise TimeoutError(f"No response from {url}")
+
+
+def run_once(timeout=60):
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=SRC_DIR, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout
+        wait_for(f"{BASE_URL}/api/health", deadline)
+        health_time = time.monotonic() - start
+
+        games_start = time.monotonic()
+        wait_for(f"{BASE_URL}/api/games", deadline)
+        games_time = time.monotonic() - games_start
+        return health_time, games_time
+    finally:
+        # Le reloader de debug lance un processus enfant : on arrête tout le groupe
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    results = [run_once() for _ in range(runs)]
+    print(f"{runs} lancements de main.py")
+    print(f"  première réponse /api/health : {min(r[0] for r in results) * 1000:8.1f} ms (meilleur)")
+    print(f"  première requête /api/games  : {min(r[1] for r in results) * 1000:8.1f} ms (meilleur)")
+
+
+if __name__ == '__main__':
+    main()
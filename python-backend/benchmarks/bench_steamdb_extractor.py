@@ -0,0 +1,126 @@
+"""
+Benchmark : extraction des lignes de succès d'une page SteamDB /stats/.
+Compare l'ancien parcours BeautifulSoup (si bs4 est installé) avec extract_steamdb_rows
+(html.parser streaming, et lxml si installé), et vérifie la parité des résultats :
+- sur une page synthétique (cas limites : entités, balises imbriquées, lignes sans cellule, tr non-app),
+- sur des pages SteamDB sauvegardées : celles passées en argument, sinon tests/fixtures/steamdb
+  (les lignes attendues de ces pages sont vérifiées par tests/test_steamdb_stats.py).
+
+Utilisation :
+    python python-backend/benchmarks/bench_steamdb_extractor.py [page.html ...]
+"""
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'steamdb')
+
+import steamdb_stats
+from steamdb_stats import extract_steamdb_rows
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+EDGE_CASES = """<html><head><title>Stats</title><script>var x = "<tr class='app'>";</script></head><body>
+<table class="table">
+<tr class="app" data-appid="1">
+  <td class="span6" data-sort="ACH_ENTITY"><b>Fish &amp; Chips</b> <i>caf&eacute;</i></td>
+  <td class="span2">12.5%</td>
+</tr>
+<tr class="app hidden-row"><td class="span2"> 3% </td><td class="span6" data-sort=" ACH_ORDER ">Order</td></tr>
+<tr class="apps"><td class="span6" data-sort="NOT_A_ROW">x</td><td class="span2">1%</td></tr>
+<tr class="app"><td class="span6" data-sort="NO_PERCENT">Missing</td></tr>
+<tr class="app"><td class="span6">No sort</td><td class="span2">n/a</td></tr>
+<tr class="app"><td class="span6 wide" data-sort="ACH_NESTED"><div><span>Deep</span> name</div></td>
+  <td class="span2"><span>0.1</span>%</td></tr>
+</table></body></html>
+"""
+
+EDGE_CASES_EXPECTED = [
+    ('ACH_ENTITY', 'Fish & Chips café', '12.5%'),
+    ('ACH_ORDER', 'Order', '3%'),
+    ('', 'No sort', 'n/a'),
+    ('ACH_NESTED', 'Deep name', '0.1%'),
+]
+
+
+def synthetic_page(achievements):
+    rows = []
+    for i in range(achievements):
+        rows.append(
+            f'<tr class="app" data-achievement="ACH_{i}">'
+            f'<td class="span1"><img src="https://cdn.example/{i}.jpg" alt=""></td>'
+            f'<td class="span6" data-sort="ACH_{i}">Achievement {i} &amp; more'
+            f'<p class="i">Do the thing number {i} without dying</p></td>'
+            f'<td class="span2">{(i * 7919) % 10000 / 100:.2f}%</td></tr>\n'
+        )
+    filler = '<div class="nav"><a href="/x">link</a><span>menu</span></div>\n' * 2000
+    return (f'<!DOCTYPE html><html><head><title>x</title></head><body>{filler}'
+            f'<table><tbody>{"".join(rows)}</tbody></table>{filler}</body></html>').encode('utf-8')
+
+
+def extract_rows_bs4(content):
+    """Parcours d'origine (get_gratuit_achievements avant l'extracteur ciblé)"""
+    soup = BeautifulSoup(content, 'html.parser')
+    rows = []
+    for row in soup.find_all('tr', class_='app'):
+        name_cell = row.find('td', class_='span6')
+        perc_cell = row.find('td', class_='span2')
+        if name_cell and perc_cell:
+            rows.append((name_cell.get('data-sort', '').strip(), name_cell.text.strip(), perc_cell.text.strip()))
+    return rows
+
+
+def backends():
+    available = {'html.parser': lambda content: extract_steamdb_rows(content, 'html.parser')}
+    if steamdb_stats.lxml_html is not None:
+        available['lxml'] = lambda content: extract_steamdb_rows(content, 'lxml')
+    if BeautifulSoup is not None:
+        available['bs4 (reference)'] = extract_rows_bs4
+    return available
+
+
+def check_parity(label, content, expected=None):
+    results = {name: extract(content) for name, extract in backends().items()}
+    reference = expected if expected is not None else next(iter(results.values()))
+    for name, rows in results.items():
+        assert rows == reference, f"{label}: {name} diverges ({len(rows)} rows vs {len(reference)})"
+    print(f"parity OK  {label}: {len(reference)} rows, backends: {', '.join(results)}")
+
+
+def bench(content, label="synthetic", repeat=5):
+    print(f"\n{label}: {len(content) // 1024} KiB page")
+    for name, extract in backends().items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = extract(content)
+            best = min(best, time.perf_counter() - start)
+        print(f"  {name:16s}: {best * 1000:8.2f} ms  ({len(rows)} rows)")
+
+
+def main():
+    check_parity("edge cases", EDGE_CASES.encode('utf-8'), EDGE_CASES_EXPECTED)
+
+    page = synthetic_page(500)
+    check_parity("synthetic 500", page)
+
+    saved_pages = sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES, '*.html')))
+    for path in saved_pages:
+        with open(path, 'rb') as f:
+            check_parity(os.path.basename(path), f.read())
+
+    bench(page)
+    for path in saved_pages:
+        with open(path, 'rb') as f:
+            bench(f.read(), os.path.basename(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,89 @@
 import os
-import configparser
-import game_detector
+import re
+import hashlib
+import threading
+import time
 import requests
-import json
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from config_manager import ConfigManager
 from cache_manager import CacheManager
+from cache_backends import is_expired
+from local_achievements import parse_local_file
+from steamdb_stats import extract_steamdb_rows, parse_percentage
+from game_summary import build_game_summary, rarity_level
+from steam_http import SteamHttpClient
+
+
+# Query parameters carrying credentials: never part of a cache key
+SECRET_PARAMS = {'key', 'access_token'}
+STEAM_CACHE_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# Shared (never mutated) placeholder for a missing percentages record
+NO_PERCENTAGES = {}
+
+
+def make_steam_cache_key(url, params):
+    """Process-stable cache key: sha256 of the canonical URL plus sorted params, secrets stripped"""
+    parts = urlsplit(url)
+    canonical_url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', '', ''))
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(str(k), str(v)) for k, v in (params or {}).items()]
+    query = sorted((k, v) for k, v in query if k.lower() not in SECRET_PARAMS)
+
+    return hashlib.sha256(f"{canonical_url}?{urlencode(query)}".encode('utf-8')).hexdigest()
+
+
+def is_steam_cache_key(key):
+    """True for keys produced by make_steam_cache_key (anything else is a pre-migration leftover)"""
+    return bool(STEAM_CACHE_KEY_PATTERN.match(key))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key: the first caller runs the function,
+    the others wait for and share its result (or exception)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> Future of the in-flight call
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
 
 
 class AchievementParser:
-    def __init__(self, config_file=None):
+    def __init__(self, config_file=None, config_manager=None):
         self.achievement_files = {}
+        # Parsed local files: path -> ((st_mtime_ns, st_size), LocalAchievementFile)
+        self.local_file_cache = {}
 
         if config_file is None:
             config_file = os.path.join(os.path.dirname(__file__), "..", "..", "config.json")
 
-        # Initialize configuration manager
-        self.config_manager = ConfigManager(config_file)
+        # Initialize configuration manager (shared with the other components when provided)
+        self.config_manager = config_manager or ConfigManager(config_file)
 
         # Initialize cache manager
         self.cache_manager = CacheManager(self.config_manager)
@@ -28,17 +95,45 @@ class AchievementParser:
         self.timeout = steam_api_config.get("timeout", 10)
         self.max_retries = steam_api_config.get("max_retries", 3)
 
+        # Pooled, rate-limited client shared with GameDetector (retries and backoff live there)
+        self.http_client = SteamHttpClient.from_config(self.config_manager)
+
         # Load achievements configuration
         achievements_config = self.config_manager.get("achievements", {})
         self.fallback_beautify = achievements_config.get("fallback_beautify", True)
         self.show_hidden = achievements_config.get("show_hidden", True)
         self.sort_by_percentage = achievements_config.get("sort_by_percentage", True)
+        # SteamDB page extractor: "auto" (lxml when installed), "lxml" or "html.parser"
+        self.steamdb_parser = achievements_config.get("steamdb_parser", "auto")
+
+        # Load background refresh configuration (schema and percentages refresh on separate schedules)
+        refresh_config = self.config_manager.get("refresh", {})
+        self.schema_ttl = refresh_config.get("schema_interval", 7 * 24 * 3600)
+        self.percentages_ttl = refresh_config.get("percentages_interval", 6 * 3600)
+
+        # Set by BackgroundRefresher.attach(); without it, stale entries are refreshed synchronously
+        self.background_refresher = None
+        self.stale_apps = set()
+
+        # Concurrent identical lookups share one in-flight fetch
+        self.single_flight = SingleFlight()
+
+        # Achievements source per app (schema/percentages merge or gratuit record), keyed on the
+        # version of its cache records so a hit never reads nor decodes them: app_id -> (version, source)
+        self.achievement_sources = {}
+        # Materialized per-game aggregates: app_id -> (records version, LocalAchievementFile, GameSummary)
+        self.game_summaries = {}
 
         # Load debug configuration
         debug_config = self.config_manager.get("debug", {})
         self.verbose = debug_config.get("verbose_mode", False)
         self.show_api_calls = debug_config.get("show_api_calls", False)
 
+        # Drop steam_store entries keyed with the old per-process hash() scheme
+        self.cache_manager.purge_cache_keys("steam_store", is_steam_cache_key)
+        # Drop combined <app>_steam entries, replaced by separate <app>_schema / <app>_percentages records
+        self.cache_manager.purge_cache_keys("achievements", lambda key: not key.endswith("_steam"))
+
         # Cleanup expired cache on startup if configured
         cache_config = self.config_manager.get("cache", {})
         if cache_config.get("cleanup_on_start", True):
@@ -57,52 +152,146 @@ class AchievementParser:
         if self.verbose:
             print(f"DEBUG: {message}")
 
-    def make_steam_request(self, url, params):
-        """Make HTTP request to Steam API with retry logic and caching"""
-        # Generate cache key from URL and params
-        cache_key = f"{url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
-        cache_key_hash = str(hash(cache_key))
+    def make_steam_request(self, url, params, ttl=3600, use_cache=True):
+        """Make HTTP request to Steam API with retry logic and caching (use_cache=False: neither read nor store)"""
+        # Stable across restarts and free of the API key
+        cache_key_hash = make_steam_cache_key(url, params)
 
         # Try to get from cache first
-        cached_data = self.cache_manager.get_cache("steam_store", cache_key_hash)
+        cached_data = self.cache_manager.get_cache("steam_store", cache_key_hash) if use_cache else None
         if cached_data:
             self.log_debug(f"Cache HIT for Steam request: {url}")
             return cached_data
 
         self.log_debug(f"Cache MISS for Steam request: {url}")
+        return self.single_flight.do(("steam_request", cache_key_hash, use_cache),
+                                     self._fetch_steam_request, url, params, cache_key_hash, ttl, use_cache)
 
-        # Make actual HTTP request
-        for attempt in range(self.max_retries):
-            try:
-                if self.show_api_calls:
-                    print(f"API Call [{attempt + 1}/{self.max_retries}]: {url}")
+    def _fetch_steam_request(self, url, params, cache_key_hash, ttl, use_cache):
+        """Network half of make_steam_request (run once per key by the single-flight layer)"""
+        # Make actual HTTP request (retries, backoff and rate limiting handled by the HTTP client)
+        try:
+            if self.show_api_calls:
+                print(f"API Call: {url}")
 
-                response = requests.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
+            response = self.http_client.get(url, params=params)
+            response.raise_for_status()
 
-                data = response.json()
+            data = response.json()
 
-                # Cache successful response (TTL: 1 hour for API calls)
-                self.cache_manager.set_cache("steam_store", cache_key_hash, data, ttl=3600)
+        except (requests.RequestException, ValueError) as e:
+            self.log_debug(f"Request failed: {e}")
+            return None
 
-                return data
+        # Cache successful response (TTL: 1 hour by default)
+        if use_cache:
+            self.cache_manager.set_cache("steam_store", cache_key_hash, data, ttl=ttl)
 
-            except requests.RequestException as e:
-                self.log_debug(f"Request attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    return None
+        return data
 
-        return None
+    def get_cached_achievements(self, app_id, cache_key, kind="percentages"):
+        """Return a cached achievements record (None if absent), serving an expired one as stale
+        while a background refresh of that kind runs"""
+        entry = self.cache_manager.get_cache_entry("achievements", cache_key)
+        if not entry:
+            return None
+
+        data, stale = entry
+        if not stale:
+            return data
+        if self.background_refresher is None:
+            return None
+
+        self.log_debug(f"Serving stale {kind} for {app_id}, refresh scheduled")
+        self.stale_apps.add(str(app_id))
+        self.background_refresher.request_refresh(app_id, kind)
+        return data
+
+    def is_data_stale(self, app_id):
+        """True if the last achievements served for app_id came from an expired entry"""
+        return str(app_id) in self.stale_apps
+
+    def refresh_cache_keys(self, app_id):
+        """Cache records behind get_best_achievements_auto(app_id), by refresh kind"""
+        if self.steam_api_key:
+            return {"schema": f"{app_id}_schema", "percentages": f"{app_id}_percentages"}
+        return {"percentages": f"{app_id}_gratuit"}
+
+    def refresh_achievements(self, app_id, refresh_schema=False):
+        """Re-fetch achievements bypassing the cache (percentages always, schema if asked). Returns success"""
+        if self.steam_api_key:
+            if refresh_schema and self.fetch_steam_schema(app_id, self.steam_api_key) is None:
+                return False
+            refreshed = self.fetch_steam_percentages(app_id) is not None
+        else:
+            refreshed = bool(self.fetch_gratuit_achievements(app_id, refresh=True))
+
+        if refreshed:
+            self.stale_apps.discard(str(app_id))
+        return refreshed
 
     def get_steam_achievements_with_key(self, app_id, api_key):
-        """Fetch achievements from Steam API with caching"""
-        # Check cache first
-        cached_achievements = self.cache_manager.get_cache("achievements", f"{app_id}_steam")
-        if cached_achievements:
-            self.log_debug(f"Loading Steam achievements for {app_id} from cache")
-            return cached_achievements
+        """Fetch achievements from Steam API with caching.
+        Schema (long-lived) and global percentages (short-lived) are separate records, merged on read."""
+        self.stale_apps.discard(str(app_id))
+        version = self.get_achievements_version(app_id)
+        source = self._memoized_source(app_id, version)
+        if source is not None:
+            return source
+
+        schema = self.get_cached_achievements(app_id, f"{app_id}_schema", "schema")
+        if schema is None:
+            schema = self.fetch_steam_schema(app_id, api_key)
+            if schema is None:
+                return {}
+
+        percentages = self.get_cached_achievements(app_id, f"{app_id}_percentages", "percentages")
+        if percentages is None:
+            percentages = self.fetch_steam_percentages(app_id) or NO_PERCENTAGES
+
+        return self.merge_steam_achievements(app_id, schema, percentages, version)
+
+    def merge_steam_achievements(self, app_id, schema, percentages, version=None):
+        """Combine schema and percentages; the result is kept as long as the records' version is unchanged"""
+        achievements_data = {
+            name: dict(entry, percentage=percentages.get(name, 0), source='STEAM_API')
+            for name, entry in schema.items()
+        }
+        self._remember_source(app_id, version, achievements_data)
+        return achievements_data
 
-        self.log_debug(f"Fetching Steam achievements for {app_id} from API")
+    def get_achievements_version(self, app_id):
+        """Creation time of each cache record behind the achievements, or None if one is missing.
+        Only metadata is read. An expired record is reported stale and its refresh scheduled, as a read would;
+        without a background refresher it would be re-fetched, so there is no usable version (None)"""
+        app_id = str(app_id)
+        now = time.time()
+        version = []
+        for kind, cache_key in self.refresh_cache_keys(app_id).items():
+            meta = self.cache_manager.get_cache_metadata("achievements", cache_key)
+            if meta is None:
+                return None
+            if is_expired(meta, now):
+                if self.background_refresher is None:
+                    return None
+                self.stale_apps.add(app_id)
+                self.background_refresher.request_refresh(app_id, kind)
+            version.append((kind, meta.get("created_time")))
+        return tuple(version)
+
+    def _memoized_source(self, app_id, version):
+        memo = self.achievement_sources.get(str(app_id))
+        if version is not None and memo and memo[0] == version:
+            return memo[1]
+        return None
+
+    def _remember_source(self, app_id, version, source):
+        if version is not None and source:
+            self.achievement_sources[str(app_id)] = (version, source)
+
+    def fetch_steam_schema(self, app_id, api_key):
+        """Fetch GetSchemaForGame and store the <app>_schema record. Returns None if the request failed"""
+        self.log_debug(f"Fetching Steam schema for {app_id} from API")
 
         url = "http://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v0002/"
         params = {
@@ -111,47 +300,60 @@ class AchievementParser:
             'l': self.language
         }
 
-        data = self.make_steam_request(url, params)
+        data = self.make_steam_request(url, params, use_cache=False)
         if not data or 'game' not in data:
-            return {}
+            return None
 
-        achievements_data = {}
+        schema = {}
         for ach in data['game'].get('availableGameStats', {}).get('achievements', []):
-            achievements_data[ach['name']] = {
+            schema[ach['name']] = {
                 'displayName': ach.get('displayName', ach['name']),
                 'description': ach.get('description', ''),
                 'hidden': ach.get('hidden', 0),
                 'icon': ach.get('icon', ''),
-                'icongray': ach.get('icongray', ''),
-                'percentage': 0,
-                'source': 'STEAM_API'
+                'icongray': ach.get('icongray', '')
             }
 
-        # Get achievement percentages
+        self.cache_manager.set_cache("achievements", f"{app_id}_schema", schema, ttl=self.schema_ttl)
+        self.log_debug(f"Fetched and cached schema of {len(schema)} Steam achievements for {app_id}")
+        return schema
+
+    def fetch_steam_percentages(self, app_id):
+        """Fetch GetGlobalAchievementPercentagesForApp and store the <app>_percentages record.
+        Returns None if the request failed"""
         perc_url = "http://api.steampowered.com/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v0002/"
         perc_params = {'gameid': app_id}
 
-        perc_data = self.make_steam_request(perc_url, perc_params)
-        if perc_data and 'achievementpercentages' in perc_data:
-            for ach in perc_data['achievementpercentages'].get('achievements', []):
-                ach_name = ach['name']
-                if ach_name in achievements_data:
-                    achievements_data[ach_name]['percentage'] = round(float(ach['percent']), 2)
+        perc_data = self.make_steam_request(perc_url, perc_params, use_cache=False)
+        if not perc_data or 'achievementpercentages' not in perc_data:
+            return None
 
-        # Cache achievements data (TTL: 24 hours)
-        self.cache_manager.set_cache("achievements", f"{app_id}_steam", achievements_data, ttl=86400)
+        percentages = {}
+        for ach in perc_data['achievementpercentages'].get('achievements', []):
+            percentages[ach['name']] = round(float(ach['percent']), 2)
 
-        self.log_debug(f"Fetched and cached {len(achievements_data)} Steam achievements for {app_id}")
-        return achievements_data
+        self.cache_manager.set_cache("achievements", f"{app_id}_percentages", percentages, ttl=self.percentages_ttl)
+        self.log_debug(f"Fetched and cached {len(percentages)} global percentages for {app_id}")
+        return percentages
 
     def get_gratuit_achievements(self, app_id):
         """Get achievements from gratuit sources with caching"""
+        version = self.get_achievements_version(app_id)
+        source = self._memoized_source(app_id, version)
+        if source is not None:
+            return source
+
         # Check cache first
-        cached_achievements = self.cache_manager.get_cache("achievements", f"{app_id}_gratuit")
+        cached_achievements = self.get_cached_achievements(app_id, f"{app_id}_gratuit")
         if cached_achievements:
             self.log_debug(f"Loading gratuit achievements for {app_id} from cache")
+            self._remember_source(app_id, version, cached_achievements)
             return cached_achievements
 
+        return self.fetch_gratuit_achievements(app_id)
+
+    def fetch_gratuit_achievements(self, app_id, refresh=False):
+        """Scrape SteamDB (plus local file fallback) and store the gratuit entry"""
         self.log_debug(f"Fetching gratuit achievements for {app_id}")
 
         combined = {}
@@ -159,42 +361,31 @@ class AchievementParser:
         # Try SteamDB API (free alternative)
         try:
             steamdb_url = f"https://steamdb.info/app/{app_id}/stats/"
-            response = requests.get(steamdb_url, timeout=self.timeout)
+            response = self.http_client.get(steamdb_url)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # Parse achievement data from HTML
-                achievement_rows = soup.find_all('tr', class_='app')
-                for row in achievement_rows:
-                    name_cell = row.find('td', class_='span6')
-                    perc_cell = row.find('td', class_='span2')
-
-                    if name_cell and perc_cell:
-                        ach_name = name_cell.get('data-sort', '').strip()
-                        percentage_text = perc_cell.text.strip()
-
-                        try:
-                            percentage = float(percentage_text.replace('%', ''))
-                        except (ValueError, AttributeError):
-                            percentage = 0.0
-
-                        if ach_name:
-                            display_name = name_cell.text.strip() or self.beautify_achievement_name(ach_name)
-                            combined[ach_name] = {
-                                'displayName': display_name,
-                                'description': '',
-                                'hidden': 0,
-                                'icon': '',
-                                'icongray': '',
-                                'percentage': percentage,
-                                'source': 'STEAMDB'
-                            }
+                # Targeted extraction of the tr.app rows (no DOM built)
+                for ach_name, name_text, percentage_text in extract_steamdb_rows(response.content,
+                                                                                 self.steamdb_parser):
+                    if ach_name:
+                        combined[ach_name] = {
+                            'displayName': name_text or self.beautify_achievement_name(ach_name),
+                            'description': '',
+                            'hidden': 0,
+                            'icon': '',
+                            'icongray': '',
+                            'percentage': parse_percentage(percentage_text),
+                            'source': 'STEAMDB'
+                        }
 
                 self.log_debug(f"SteamDB: Found {len(combined)} achievements")
 
         except requests.RequestException as e:
             self.log_debug(f"SteamDB request failed: {e}")
 
+        if refresh and not combined:
+            # Failed refresh: keep serving the existing (stale) entry
+            return {}
+
         # Fallback: Check local achievement file
         if app_id in self.achievement_files:
             local_achievements = self.parse_achievement_file(self.achievement_files[app_id])
@@ -245,87 +436,68 @@ class AchievementParser:
 
         for filename in possible_files:
             file_path = os.path.join(game_path, filename)
-            if os.path.exists(file_path):
-                # Vérifier que le fichier n'est pas vide et est lisible
-                try:
-                    if os.path.getsize(file_path) == 0:
-                        if self.verbose:
-                            print(f"Achievement file is empty: {file_path}")
-                        continue
-
-                    # Test de lecture rapide pour vérifier que le fichier est valide
-                    if filename.endswith('.json'):
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            json.load(f)  # Test parsing JSON
-                    elif filename.endswith('.ini'):
-                        config = configparser.ConfigParser()
-                        config.read(file_path, encoding='utf-8')
-                        # Vérifier qu'il y a au moins une section
-                        if not config.sections():
-                            if self.verbose:
-                                print(f"INI file has no sections: {file_path}")
-                            continue
-
-                    # Si on arrive ici, le fichier est valide
-                    self.achievement_files[game_id_str] = file_path
-                    if self.verbose:
-                        print(f"✅ Found valid achievement file for {game_id}: {file_path}")
-                    return True
-
-                except (json.JSONDecodeError, configparser.Error, UnicodeDecodeError, OSError) as e:
+            try:
+                if os.path.getsize(file_path) == 0:
                     if self.verbose:
-                        print(f"❌ Invalid achievement file {file_path}: {e}")
+                        print(f"Achievement file is empty: {file_path}")
                     continue
+            except OSError:
+                continue
+
+            # Parse unique : le résultat valide le fichier et sert aussi à parse_achievement_file
+            local_file = self.load_local_file(file_path)
+            if local_file is None or local_file.error is not None:
+                if self.verbose:
+                    print(f"❌ Invalid achievement file {file_path}: {local_file.error if local_file else 'unreadable'}")
+                continue
+            if not local_file.is_valid:
+                if self.verbose:
+                    print(f"INI file has no sections: {file_path}")
+                continue
+
+            self.achievement_files[game_id_str] = file_path
+            if self.verbose:
+                print(f"✅ Found valid achievement file for {game_id}: {file_path}")
+            return True
 
         if self.verbose:
             print(f"❌ No valid achievement files found for {game_id} in {game_path}")
         return False
 
-    def parse_achievement_file(self, file_path, app_id=None):
-        """Parse local achievement file (supports .json and .ini, et sections numériques)
-        Met en cache le résultat dans local_achievements si app_id fourni."""
-        achievements = {}
-        cache_key = None
-        if app_id is not None:
-            cache_key = str(app_id)
-            cached = self.cache_manager.get_cache("local_achievements", cache_key)
-            if cached:
-                self.log_debug(f"Cache HIT for local achievements: {cache_key}")
-                return cached
+    def load_local_file(self, file_path):
+        """Parse a local achievement file once per change and return the LocalAchievementFile.
+        Le résultat est gardé en mémoire tant que le fichier ne change pas (st_mtime_ns, st_size) :
+        un fichier inchangé ne coûte qu'un stat. Retourne None si le fichier est illisible."""
         try:
-            if file_path.endswith('.json'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for ach_id, ach_data in data.items():
-                    if not ach_data.get('earned', False):
-                        continue
-                    achievements[ach_id] = {
-                        'earned': True,
-                        'earned_time': ach_data.get('earned_time', 0)
-                    }
-            elif file_path.endswith('.ini'):
-                config = configparser.ConfigParser()
-                config.read(file_path, encoding='utf-8')
-                for section in config.sections():
-                    if section == 'SteamAchievements':
-                        continue
-                    achieved = config[section].get('Achieved')
-                    unlock_time = config[section].get('UnlockTime', 0)
-                    if achieved is not None:
-                        achievements[section] = {
-                            'earned': achieved == '1',
-                            'earned_time': int(unlock_time)
-                        }
-        except (configparser.Error, OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            stat = os.stat(file_path)
+        except OSError as e:
             self.log_debug(f"Error parsing achievement file {file_path}: {e}")
-        # Mise en cache si app_id fourni
-        if cache_key is not None:
-            self.cache_manager.set_cache("local_achievements", cache_key, achievements, ttl=3600)
-        return achievements
+            self.local_file_cache.pop(file_path, None)
+            return None
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        cached = self.local_file_cache.get(file_path)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        # Concurrent requests for a changed file share one parse
+        local_file = self.single_flight.do(("local_file", file_path, fingerprint), parse_local_file, file_path)
+        if local_file.error is not None:
+            self.log_debug(f"Error parsing achievement file {file_path}: {local_file.error}")
+
+        self.local_file_cache[file_path] = (fingerprint, local_file)
+        return local_file
+
+    def parse_achievement_file(self, file_path, app_id=None):
+        """Parse local achievement file (supports .json and .ini, et sections numériques)
+        Retourne la table des succès débloqués. app_id est conservé pour compatibilité."""
+        local_file = self.load_local_file(file_path)
+        return local_file.unlocks if local_file else {}
 
     def get_best_achievements_with_key(self, app_id, api_key):
         """Get premium achievements using Steam API key"""
-        steam_achievements = self.get_steam_achievements_with_key(app_id, api_key)
+        # Copy: the cached dict is shared with the in-memory cache tier
+        steam_achievements = dict(self.get_steam_achievements_with_key(app_id, api_key))
 
         # Combine with local achievements if available
         if app_id in self.achievement_files:
@@ -370,14 +542,19 @@ class AchievementParser:
 
     def beautify_achievement_name(self, ach_id):
         """Intelligent fallback for beautifying names"""
-        import re
         name = ach_id.replace('ACH_', '').replace('ACHIEVEMENT_', '')
         name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
         return name.title()
 
     def get_best_achievements_auto(self, app_id, api_key=None):
-        """Main method - auto-adapts based on API key availability"""
+        """Main method - auto-adapts based on API key availability.
+        Concurrent calls for the same app and mode share a single lookup."""
         final_api_key = api_key or self.steam_api_key
+        mode = "key" if final_api_key else "gratuit"
+        return self.single_flight.do(("achievements", str(app_id), mode),
+                                     self._get_best_achievements_auto, app_id, final_api_key)
+
+    def _get_best_achievements_auto(self, app_id, final_api_key):
 
         if final_api_key:
             if self.verbose:
@@ -409,24 +586,14 @@ class AchievementParser:
             if self.verbose:
                 print(f"Fichier non trouvé : {ini_path}")
             return None
-        config = configparser.ConfigParser()
-        try:
-            config.read(ini_path, encoding='utf-8')
-            if 'SteamAchievements' in config:
-                count_str = config['SteamAchievements'].get('Count')
-                if count_str is not None:
-                    try:
-                        return int(count_str)
-                    except ValueError:
-                        if self.verbose:
-                            print(f"Valeur Count invalide dans {ini_path} : {count_str}")
-                        return None
-            if self.verbose:
-                print(f"Section [SteamAchievements] ou clé Count absente dans {ini_path}")
-        except Exception as e:
+        local_file = self.load_local_file(ini_path)
+        if local_file is None or local_file.error is not None:
             if self.verbose:
-                print(f"Erreur lecture INI {ini_path} : {e}")
-        return None
+                print(f"Erreur lecture INI {ini_path} : {local_file.error if local_file else 'illisible'}")
+            return None
+        if local_file.count is None and self.verbose:
+            print(f"Section [SteamAchievements] ou clé Count absente dans {ini_path}")
+        return local_file.count
 
     def get_local_achievements_count(self, app_id):
         """
@@ -434,78 +601,121 @@ class AchievementParser:
         en utilisant les chemins connus de la config.
         TODO : Gerer les achievements.json
         """
-        import configparser
-        import re
-        import os
-
         config = self.config_manager
         known_locations = config.known_locations if hasattr(config, 'known_locations') else config.get('known_locations', {})
-        possible_files = []
         for loc in known_locations.values():
             base_path = os.path.expanduser(loc['base_path'])
             for team in loc['teams']:
-                for fname in ["achievements.ini"]:
-                    candidate = os.path.join(base_path, team, app_id, fname)
-                    if os.path.exists(candidate):
-                        possible_files.append(candidate)
-        if not possible_files:
-            return 0
-        ini_path = possible_files[0]
-        parser = configparser.ConfigParser()
-        parser.read(ini_path, encoding="utf-8")
-        if 'SteamAchievements' in parser:
-            count = parser['SteamAchievements'].get('Count')
-            if count and re.match(r"^\d+$", count):
-                return int(count)
+                candidate = os.path.join(base_path, team, str(app_id), "achievements.ini")
+                if os.path.exists(candidate):
+                    local_file = self.load_local_file(candidate)
+                    return (local_file.count or 0) if local_file else 0
         return 0
 
     @staticmethod
     def get_rarity_level(percentage):
         """Détermine la rareté d'un achievement selon son pourcentage de déblocage"""
-        if percentage >= 50:
-            return 'common'
-        elif percentage >= 25:
-            return 'uncommon'
-        elif percentage >= 10:
-            return 'rare'
-        elif percentage >= 5:
-            return 'very_rare'
-        else:
-            return 'ultra_rare'
+        return rarity_level(percentage)
 
     def get_local_achievements_rarity_breakdown(self, app_id):
         """
         Retourne un dictionnaire avec le nombre d'achievements obtenus par rareté pour un jeu donné.
         Exemple de retour : {'common': 2, 'uncommon': 1, ...}
         """
-        rarity_stats = {'common': 0, 'uncommon': 0, 'rare': 0, 'very_rare': 0, 'ultra_rare': 0}
-        achievements = self.get_best_achievements_auto(app_id)
-        if not achievements:
-            return rarity_stats
-        # Récupère les clés des achievements obtenus localement (non normalisées, car dans achievements.ini ce sont souvent des IDs numériques)
-        local_keys = set()
+        return dict(self.get_game_summary(app_id).unlocked_rarity_breakdown)
+
+    def get_game_summary(self, app_id):
+        """Per-game aggregates (GameSummary), recomputed only when the achievement records
+        (schema/percentages or gratuit record, by creation time) or the local unlock file change.
+        A hit costs a metadata lookup per record and a stat: the records are neither read nor decoded"""
+        app_id = str(app_id)
+        mode = "key" if self.steam_api_key else "gratuit"
+        version = self.get_achievements_version(app_id)
+
+        local_file = None
         if app_id in self.achievement_files:
-            file_path = self.achievement_files[app_id]
-            local_achievements = self.parse_achievement_file(file_path)
-            if not local_achievements:
-                # Si le parsing n'a rien donné, essaye de lire la section [SteamAchievements] (cas des fichiers achievements.ini)
-                config = configparser.ConfigParser()
-                config.read(file_path, encoding='utf-8')
-                if 'SteamAchievements' in config:
-                    for key in config['SteamAchievements']:
-                        if key.isdigit():
-                            local_keys.add(key)
-            else:
-                local_keys = set(local_achievements.keys())
-            print("DEBUG: Local achievements found:", local_keys)
-        # Compte la rareté pour chaque succès obtenu
-        for ach_key, ach_data in achievements.items():
-            if ach_key in local_keys:
-                percentage = ach_data.get('percentage', 0)
-                rarity = self.get_rarity_level(percentage)
-                rarity_stats[rarity] += 1
-        return rarity_stats
-
-test = AchievementParser()
-achievements = test.get_best_achievements_auto(250900)
-print(achievements)
+            local_file = self.load_local_file(self.achievement_files[app_id])
+
+        cached = self.game_summaries.get(app_id)
+        if version is not None and cached and cached[0] == version and cached[1] is local_file:
+            return cached[2]
+
+        source = self.single_flight.do(("achievements_source", app_id, mode), self._get_achievements_source,
+                                       app_id)
+
+        unlocked_keys = self.get_unlocked_keys(local_file)
+        local_only_keys = ()
+        if local_file is not None and mode == "key":
+            # Same extra entries as get_best_achievements_with_key (LOCAL_COMBINED)
+            local_only_keys = local_file.unlocks.keys()
+
+        summary = build_game_summary(source or {}, unlocked_keys, local_only_keys)
+        if version is not None and source:
+            # Version read before the source: a record rewritten meanwhile only costs one more rebuild
+            self.game_summaries[app_id] = (version, local_file, summary)
+        return summary
+
+    @staticmethod
+    def get_unlocked_keys(local_file):
+        """Earned achievement keys of a parsed local file (INI sections also list locked ones).
+        achievements.ini without parsed sections: fall back on the [SteamAchievements] keys"""
+        if local_file is None:
+            return set()
+        if not local_file.unlocks:
+            return set(local_file.index_keys)
+        return {key for key, data in local_file.unlocks.items() if data.get('earned', True)}
+
+    def get_cached_achievements_source(self, app_id):
+        """Like _get_achievements_source, from the cache only (None if the game was never loaded)"""
+        version = self.get_achievements_version(app_id)
+        source = self._memoized_source(app_id, version)
+        if source is not None:
+            return source
+
+        if self.steam_api_key:
+            schema = self.get_cached_achievements(app_id, f"{app_id}_schema", "schema")
+            if schema is None:
+                return None
+            percentages = self.get_cached_achievements(app_id, f"{app_id}_percentages", "percentages")
+            return self.merge_steam_achievements(app_id, schema, percentages or NO_PERCENTAGES, version)
+
+        source = self.get_cached_achievements(app_id, f"{app_id}_gratuit")
+        self._remember_source(app_id, version, source)
+        return source
+
+    def get_game_version(self, app_id, game_path=None):
+        """Everything the achievements served for app_id depend on, without parsing or fetching anything:
+        creation time and expiry of the cache records, stale flag, and (st_mtime_ns, st_size) of the
+        registered local file plus the achievement files under game_path. Equal versions => same payload"""
+        app_id = str(app_id)
+        now = time.time()
+        records = []
+        for cache_key in self.refresh_cache_keys(app_id).values():
+            meta = self.cache_manager.get_cache_metadata("achievements", cache_key)
+            records.append(None if meta is None else (meta.get("created_time"), is_expired(meta, now)))
+
+        paths = [self.achievement_files.get(app_id)]
+        if game_path:
+            paths += [os.path.join(game_path, filename) for filename in ('achievements.ini', 'achievements.json')]
+        local_files = []
+        for path in dict.fromkeys(path for path in paths if path):
+            try:
+                stat = os.stat(path)
+                local_files.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                local_files.append((path, None))
+
+        return tuple(records), app_id in self.stale_apps, tuple(local_files)
+
+    def _get_achievements_source(self, app_id):
+        """Uncopied achievements record behind get_best_achievements_auto (stable object while unchanged)"""
+        if self.steam_api_key:
+            return self.get_steam_achievements_with_key(app_id, self.steam_api_key)
+        return self.get_gratuit_achievements(app_id)
+
+
+# ==================== TESTS ====================
+if __name__ == "__main__":
+    test = AchievementParser()
+    achievements = test.get_best_achievements_auto(250900)
+    print(achievements)
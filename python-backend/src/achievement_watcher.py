@@ -0,0 +1,305 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+from log_manager import get_logger
+
+logger = get_logger(__name__)
+
+ACHIEVEMENT_FILE_NAMES = ('achievements.ini', 'achievements.json')
+
+# Dernier élément de la file d'un abonné déconnecté : le flux doit se terminer
+END_OF_STREAM = None
+
+
+class PollingBackend:
+    """Repli portable : compare (st_mtime_ns, st_size) des fichiers de succès à intervalle régulier"""
+
+    name = "polling"
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.directories = set()
+        self.fingerprints = {}
+        self.stop_event = threading.Event()
+
+    def update(self, directories):
+        directories = set(directories)
+        added = directories - self.directories
+        self.directories = directories
+        # Les dossiers déjà suivis gardent leur empreinte : aucun changement n'est perdu entre deux wait()
+        self.fingerprints = {path: fp for path, fp in self.fingerprints.items()
+                             if os.path.dirname(path) in directories}
+        self.fingerprints.update(self._snapshot(added))
+
+    def _snapshot(self, directories=None):
+        fingerprints = {}
+        for directory in self.directories if directories is None else directories:
+            for filename in ACHIEVEMENT_FILE_NAMES:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                    fingerprints[path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    pass
+        return fingerprints
+
+    def wait(self, timeout):
+        """Attend jusqu'à timeout secondes et retourne les (dossier, fichier) modifiés"""
+        if self.stop_event.wait(min(timeout, self.interval)):
+            return set()
+
+        current = self._snapshot()
+        changed = {path for path in current.keys() | self.fingerprints.keys()
+                   if current.get(path) != self.fingerprints.get(path)}
+        self.fingerprints = current
+        return {os.path.split(path) for path in changed}
+
+    def close(self):
+        self.stop_event.set()
+
+
+class InotifyBackend:
+    """Linux : un watch inotify par dossier de jeu, lu via ctypes (aucune dépendance)"""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # wd -> directory
+        self.directories = {}  # directory -> wd
+
+    def update(self, directories):
+        directories = set(directories)
+        for directory in set(self.directories) - directories:
+            self.libc.inotify_rm_watch(self.fd, self.directories.pop(directory))
+        for directory in directories - set(self.directories):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd >= 0:
+                self.directories[directory] = wd
+                self.watches[wd] = directory
+
+    def wait(self, timeout):
+        """Attend jusqu'à timeout secondes et retourne les (dossier, fichier) modifiés"""
+        try:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+        except (OSError, ValueError):
+            return set()
+        if not readable:
+            return set()
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + length]
+            offset += self.EVENT_HEADER.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Événements perdus : on considère tous les fichiers surveillés comme modifiés
+                return {(d, f) for d in self.directories for f in ACHIEVEMENT_FILE_NAMES}
+            if mask & self.IN_IGNORED:
+                directory = self.watches.pop(wd, None)
+                if directory is not None:
+                    self.directories.pop(directory, None)
+                continue
+
+            filename = os.fsdecode(name.rstrip(b'\0'))
+            if filename in ACHIEVEMENT_FILE_NAMES and wd in self.watches:
+                changed.add((self.watches[wd], filename))
+
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class AchievementWatcher:
+    """Surveille les fichiers de succès connus de GameDetector / AchievementParser,
+    re-parse uniquement le fichier modifié (après debounce) et pousse le delta aux abonnés."""
+
+    def __init__(self, achievement_parser, game_detector, debounce=0.5, poll_interval=2.0,
+                 resync_interval=10.0, backend="auto"):
+        self.achievement_parser = achievement_parser
+        self.game_detector = game_detector
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.backend_name = backend
+
+        self.backend = None
+        self.thread = None
+        self.running = False
+        self.lock = threading.Lock()
+
+        self.subscribers = set()
+        self.watched_dirs = {}  # dossier du jeu -> app_id
+        self.app_dirs = {}  # app_id -> dossier du jeu
+        self.snapshots = {}  # app_id -> {ach_key: earned_time} des succès obtenus
+        self.pending = {}  # app_id -> échéance du debounce (time.monotonic)
+
+    def _create_backend(self):
+        if self.backend_name in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return InotifyBackend()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify indisponible, repli sur le polling : {e}")
+        return PollingBackend(self.poll_interval)
+
+    def start(self):
+        """Démarre le thread de surveillance (idempotent)"""
+        with self.lock:
+            if self.running:
+                return
+            self.backend = self._create_backend()
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="achievement-watcher", daemon=True)
+            self.thread.start()
+        logger.info(f"Surveillance des succès démarrée ({self.backend.name})")
+
+    def stop(self):
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        self.thread.join(timeout=5)
+        self.backend.close()
+
+    def subscribe(self):
+        """Retourne une file recevant les événements, puis END_OF_STREAM si l'abonné est déconnecté ;
+        démarre la surveillance au premier abonné"""
+        subscriber = queue.Queue(maxsize=256)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        self.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Client trop lent : on le déconnecte plutôt que de bloquer la surveillance
+                self.unsubscribe(subscriber)
+                self._close(subscriber)
+
+    @staticmethod
+    def _close(subscriber):
+        """Remplace les événements en attente par END_OF_STREAM : le flux se termine, le client se reconnecte
+        (et se resynchronise) au lieu de rester connecté sans plus rien recevoir"""
+        while True:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                break
+        subscriber.put_nowait(END_OF_STREAM)
+
+    def sync_watched_files(self):
+        """Met à jour la liste des dossiers surveillés à partir des jeux détectés"""
+        watched = {}
+        for app_id, game_info in self.game_detector.get_games_snapshot().items():
+            if game_info.get('path'):
+                watched[game_info['path']] = str(app_id)
+        for app_id, file_path in dict(self.achievement_parser.achievement_files).items():
+            watched.setdefault(os.path.dirname(file_path), str(app_id))
+
+        for directory, app_id in watched.items():
+            if app_id not in self.snapshots:
+                self.snapshots[app_id] = self._read_unlocks(app_id, directory)
+
+        self.watched_dirs = watched
+        self.app_dirs = {app_id: directory for directory, app_id in watched.items()}
+        self.backend.update(watched.keys())
+
+    def _read_unlocks(self, app_id, directory):
+        """Parse le fichier de succès du jeu (un stat si inchangé) et retourne {clé: earned_time} des succès obtenus"""
+        parser = self.achievement_parser
+        file_path = parser.achievement_files.get(app_id)
+        if not file_path or not os.path.exists(file_path):
+            if not parser.check_achievements_file(directory, app_id):
+                return {}
+            file_path = parser.achievement_files[app_id]
+
+        return {key: data.get('earned_time', 0)
+                for key, data in parser.parse_achievement_file(file_path).items()
+                if data.get('earned')}
+
+    def _run(self):
+        next_resync = 0
+        while self.running:
+            try:
+                now = time.monotonic()
+                if now >= next_resync:
+                    self.sync_watched_files()
+                    next_resync = now + self.resync_interval
+
+                timeout = min(self.poll_interval, max(0.0, next_resync - now))
+                if self.pending:
+                    timeout = min(timeout, max(0.0, min(self.pending.values()) - now))
+
+                for directory, _ in self.backend.wait(timeout):
+                    app_id = self.watched_dirs.get(directory)
+                    if app_id is not None:
+                        self.pending[app_id] = time.monotonic() + self.debounce
+
+                self._process_due()
+            except Exception as e:
+                logger.error(f"Erreur dans la surveillance des succès : {e}", exc_info=True)
+                time.sleep(self.poll_interval)
+
+    def _process_due(self):
+        now = time.monotonic()
+        for app_id in [app_id for app_id, due in self.pending.items() if due <= now]:
+            del self.pending[app_id]
+            directory = self.app_dirs.get(app_id)
+            if directory is None:
+                continue
+
+            previous = self.snapshots.get(app_id, {})
+            current = self._read_unlocks(app_id, directory)
+            self.snapshots[app_id] = current
+
+            unlocked = {key: current[key] for key in current.keys() - previous.keys()}
+            locked = sorted(previous.keys() - current.keys())
+            if unlocked or locked:
+                self.publish({
+                    'type': 'achievements_changed',
+                    'app_id': app_id,
+                    'unlocked': unlocked,
+                    'locked': locked,
+                    'unlocked_count': len(current),
+                    'timestamp': time.time()
+                })
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+
+from log_manager import get_logger
+
+logger = get_logger(__name__)
+
+
+class BackgroundRefresher:
+    """Rafraîchit en arrière-plan les succès Steam (schéma et pourcentages globaux).
+    - request_refresh() : appelé quand une entrée expirée est servie "stale"
+    - un planificateur rafraîchit les jeux de games_sources avant leur expiration,
+      le schéma et les pourcentages étant des entrées de cache distinctes avec chacune son intervalle."""
+
+    KINDS = ("schema", "percentages")
+
+    def __init__(self, achievement_parser, game_detector, schema_interval=7 * 24 * 3600,
+                 percentages_interval=6 * 3600, check_interval=60, workers=2, retry_delay=300):
+        self.achievement_parser = achievement_parser
+        self.game_detector = game_detector
+        self.intervals = {"schema": schema_interval, "percentages": percentages_interval}
+        self.check_interval = check_interval
+        self.retry_delay = retry_delay
+        self.workers = workers
+
+        self.jobs = queue.Queue()
+        self.queued = set()  # (app_id, kind) en attente, pour dédoublonner
+        self.retry_after = {}  # (app_id, kind) -> pas de nouvel essai avant cette date après un échec
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+        self.stats = {"refreshed": 0, "failed": 0}
+
+    def attach(self):
+        """Branche le rafraîchisseur sur AchievementParser (service des entrées stale) et le démarre"""
+        self.achievement_parser.background_refresher = self
+        self.start()
+        return self
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for index in range(self.workers):
+                self.threads.append(threading.Thread(target=self._worker, name=f"refresher-{index}", daemon=True))
+            self.threads.append(threading.Thread(target=self._scheduler, name="refresher-scheduler", daemon=True))
+            for thread in self.threads:
+                thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        for _ in range(self.workers):
+            self.jobs.put(None)
+
+    def request_refresh(self, app_id, kind="percentages"):
+        """Planifie un rafraîchissement ; ignoré si le même est déjà en attente"""
+        job = (str(app_id), kind)
+        with self.lock:
+            if job in self.queued or time.time() < self.retry_after.get(job, 0):
+                return False
+            self.queued.add(job)
+        self.jobs.put(job)
+        return True
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            job = self.jobs.get()
+            if job is None:
+                return
+            with self.lock:
+                self.queued.discard(job)
+
+            app_id, kind = job
+            try:
+                refreshed = self.achievement_parser.refresh_achievements(app_id, refresh_schema=(kind == "schema"))
+            except Exception as e:
+                logger.error(f"Rafraîchissement {kind} impossible pour {app_id} : {e}", exc_info=True)
+                refreshed = False
+
+            with self.lock:
+                if not refreshed:
+                    self.stats["failed"] += 1
+                    self.retry_after[job] = time.time() + self.retry_delay
+                    continue
+
+                self.retry_after.pop(job, None)
+                self.stats["refreshed"] += 1
+
+    def _scheduler(self):
+        while not self.stop_event.wait(self.check_interval):
+            try:
+                self.schedule_due_refreshes()
+            except Exception as e:
+                logger.error(f"Erreur du planificateur de rafraîchissement : {e}", exc_info=True)
+
+    def schedule_due_refreshes(self):
+        """Planifie les jeux détectés dont le schéma ou les pourcentages arrivent à échéance (à 90 %)"""
+        now = time.time()
+        cache_manager = self.achievement_parser.cache_manager
+        scheduled = 0
+
+        for app_id in self.game_detector.get_games_snapshot():
+            for kind, cache_key in self.achievement_parser.refresh_cache_keys(app_id).items():
+                # Rien à rafraîchir tant que le jeu n'a jamais été chargé
+                meta = cache_manager.get_cache_metadata("achievements", cache_key)
+                if meta is not None and now - meta["created_time"] >= self.intervals[kind] * 0.9:
+                    scheduled += self.request_refresh(app_id, kind)
+
+        if scheduled:
+            logger.info(f"{scheduled} rafraîchissements planifiés")
+        return scheduled
@@ -0,0 +1,503 @@
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+
+# Errors a backend may raise on I/O or a corrupted entry
+BACKEND_ERRORS = (OSError, ValueError, sqlite3.Error)
+
+
+def is_expired(meta: Dict[str, Any], now: float) -> bool:
+    """Check a metadata record (created_time + ttl) against the given time"""
+    return (now - meta.get("created_time", 0)) > meta.get("ttl", 0)
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int, blocking: bool):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+    def _unlock_fd(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int, blocking: bool):
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file, shared by every process using the same cache_dir.
+    Raises TimeoutError (an OSError) if it cannot be acquired within timeout seconds"""
+
+    def __init__(self, path, timeout: float = 10.0, poll_interval: float = 0.01):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.fd = None
+
+    def acquire(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                _lock_fd(fd, blocking=False)
+                self.fd = fd
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        fd, self.fd = self.fd, None
+        try:
+            _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def atomic_write_json(path: Path, data: Any, **dump_kwargs):
+    """Write to a temporary file in the same directory then rename it over path,
+    so readers in any process see either the old or the new content, never a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class JsonCacheBackend:
+    """Legacy layout: one JSON file per entry under <cache_dir>/<type>/ plus a global cache_metadata.json.
+
+    Safe when several processes share the cache_dir: every change takes cache_metadata.lock,
+    re-reads the index from disk and applies only its own entries before renaming the new index
+    into place, so processes never overwrite each other's entries. Entry files are written the
+    same way (temporary file + rename). Readers reload the index when its file changes."""
+
+    name = "json"
+
+    def __init__(self, cache_base_dir: str, cache_types: Iterable[str], lock_timeout: float = 10.0):
+        self.cache_base_dir = cache_base_dir
+        self.cache_types = list(cache_types)
+        self.metadata_file = Path(cache_base_dir) / "cache_metadata.json"
+        self.file_lock = FileLock(Path(cache_base_dir) / "cache_metadata.lock", timeout=lock_timeout)
+        self.metadata_stamp = None  # identity of the index file last loaded or written
+
+        self.setup_cache_directories()
+        self.metadata = self.load_metadata()
+
+    def setup_cache_directories(self):
+        """Create cache directory structure (raises OSError on failure)"""
+        for cache_type in self.cache_types:
+            (Path(self.cache_base_dir) / cache_type).mkdir(parents=True, exist_ok=True)
+
+    def _metadata_file_stamp(self):
+        try:
+            st = self.metadata_file.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def load_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Load cache metadata from disk"""
+        metadata = {}
+        self.metadata_stamp = self._metadata_file_stamp()
+        try:
+            if self.metadata_stamp is not None:
+                with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Could not load cache metadata: {e}")
+
+        for cache_type in self.cache_types:
+            metadata.setdefault(cache_type, {})
+        return metadata
+
+    def refresh_metadata(self):
+        """Reload the index if another process replaced it since we last loaded or wrote it"""
+        if self._metadata_file_stamp() != self.metadata_stamp:
+            self.metadata = self.load_metadata()
+
+    def save_metadata(self) -> bool:
+        """Save cache metadata to disk (callers hold file_lock)"""
+        try:
+            atomic_write_json(self.metadata_file, self.metadata, indent=2)
+            self.metadata_stamp = self._metadata_file_stamp()
+            return True
+        except OSError as e:
+            print(f"Warning: Could not save cache metadata: {e}")
+            self.metadata_stamp = None
+            return False
+
+    def update_metadata(self, apply: Callable[[Dict[str, Dict[str, Any]]], Any]):
+        """Read-modify-write of the index under the cross-process lock.
+        apply() mutates the freshly loaded index and returns (result, changed)"""
+        with self.file_lock:
+            self.refresh_metadata()
+            try:
+                result, changed = apply(self.metadata)
+            except BaseException:
+                self.metadata_stamp = None  # in-memory index may be half-applied: reload next time
+                raise
+            if changed:
+                self.save_metadata()
+            return result
+
+    def get_cache_file_path(self, cache_type: str, key: str) -> Path:
+        """Generate cache file path for given type and key"""
+        safe_key = str(key).replace('/', '_').replace('\\', '_')
+        return Path(self.cache_base_dir) / cache_type / f"{safe_key}.json"
+
+    def get_metadata(self, cache_type: str, key: str) -> Optional[Dict[str, Any]]:
+        self.refresh_metadata()
+        return self.metadata.get(cache_type, {}).get(key)
+
+    def read(self, cache_type: str, key: str, include_expired: bool = False):
+        """Return (data, metadata) or None. Raises ValueError/OSError on a corrupted entry"""
+        meta = self.get_metadata(cache_type, key)
+        if meta is None or (not include_expired and is_expired(meta, time.time())):
+            return None
+
+        cache_file = self.get_cache_file_path(cache_type, key)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f), meta
+        except FileNotFoundError:
+            # Deleted by another process since the index was loaded
+            return None
+
+    def write_many(self, entries: List[Tuple[str, str, Any, Dict[str, Any]]]) -> List[int]:
+        """Write (cache_type, key, data, metadata) entries, saving the metadata index once.
+        Returns the stored size of each entry"""
+        def apply(metadata):
+            sizes = []
+            for cache_type, key, data, meta in entries:
+                cache_file = self.get_cache_file_path(cache_type, key)
+                atomic_write_json(cache_file, data, indent=2, ensure_ascii=False)
+
+                sizes.append(cache_file.stat().st_size)
+                metadata.setdefault(cache_type, {})[key] = dict(meta, size=sizes[-1])
+            return sizes, bool(sizes)
+
+        return self.update_metadata(apply)
+
+    def delete_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Remove (cache_type, key) entries, saving the metadata index once"""
+        pairs = list(pairs)
+
+        def apply(metadata):
+            removed_count = 0
+            for cache_type, key in pairs:
+                try:
+                    self.get_cache_file_path(cache_type, key).unlink()
+                except FileNotFoundError:
+                    pass
+                if metadata.get(cache_type, {}).pop(key, None) is not None:
+                    removed_count += 1
+            return removed_count, removed_count > 0
+
+        return self.update_metadata(apply)
+
+    def clear_type(self, cache_type: str) -> int:
+        def apply(metadata):
+            removed_count = 0
+            cache_dir = Path(self.cache_base_dir) / cache_type
+            if cache_dir.exists():
+                for cache_file in cache_dir.glob("*.json"):
+                    cache_file.unlink()
+                    removed_count += 1
+
+            metadata[cache_type] = {}
+            return removed_count, True
+
+        return self.update_metadata(apply)
+
+    def delete_expired(self, now: float) -> int:
+        def apply(metadata):
+            removed_count = 0
+            for cache_type, entries in metadata.items():
+                for key in [key for key, meta in entries.items() if is_expired(meta, now)]:
+                    try:
+                        self.get_cache_file_path(cache_type, key).unlink()
+                    except FileNotFoundError:
+                        pass
+                    del entries[key]
+                    removed_count += 1
+            return removed_count, removed_count > 0
+
+        return self.update_metadata(apply)
+
+    def purge_keys(self, cache_type: str, keep: Callable[[str], bool]) -> int:
+        """Remove entries whose key is rejected by keep(), plus files no longer referenced by metadata
+        (including temporary files left behind by an interrupted write)"""
+        def apply(metadata):
+            type_metadata = metadata.setdefault(cache_type, {})
+            rejected_keys = [key for key in type_metadata if not keep(key)]
+            for key in rejected_keys:
+                del type_metadata[key]
+
+            known_files = {self.get_cache_file_path(cache_type, key).name for key in type_metadata}
+            removed_count = 0
+            cache_dir = Path(self.cache_base_dir) / cache_type
+            for cache_file in [*cache_dir.glob("*.json"), *cache_dir.glob(".*.tmp")]:
+                if cache_file.name not in known_files:
+                    cache_file.unlink()
+                    removed_count += 1
+            return removed_count, bool(rejected_keys)
+
+        return self.update_metadata(apply)
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """Return {cache_type: (entries, bytes)}"""
+        self.refresh_metadata()
+        return {cache_type: (len(entries), sum(meta.get("size", 0) for meta in entries.values()))
+                for cache_type, entries in self.metadata.items()}
+
+    def total_size(self) -> int:
+        return sum(size for _, size in self.stats().values())
+
+    def touch_many(self, accesses: Dict[Tuple[str, str], float]):
+        """Record last access times, saving the metadata index once"""
+        def apply(metadata):
+            touched = False
+            for (cache_type, key), accessed in accesses.items():
+                meta = metadata.get(cache_type, {}).get(key)
+                if meta is not None:
+                    meta["last_accessed"] = max(meta.get("last_accessed", 0), accessed)
+                    touched = True
+            return None, touched
+
+        self.update_metadata(apply)
+
+    def lru_entries(self, limit: int) -> List[Tuple[str, str, int]]:
+        """Return up to limit (cache_type, key, size) entries, least recently used first"""
+        self.refresh_metadata()
+        entries = [(meta.get("last_accessed", 0), cache_type, key, meta.get("size", 0))
+                   for cache_type, type_metadata in self.metadata.items()
+                   for key, meta in type_metadata.items()]
+        return [(cache_type, key, size) for _, cache_type, key, size in heapq.nsmallest(limit, entries)]
+
+    def close(self):
+        pass
+
+
+class SqliteCacheBackend:
+    """Single-file transactional store (SQLite in WAL mode) with an index on expiry.
+    Several processes may share the database: writers wait up to busy_timeout for each other"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            cache_type    TEXT NOT NULL,
+            key           TEXT NOT NULL,
+            data          TEXT NOT NULL,
+            created_time  REAL NOT NULL,
+            ttl           REAL NOT NULL,
+            expires_at    REAL NOT NULL,
+            size          INTEGER NOT NULL,
+            last_accessed REAL NOT NULL,
+            PRIMARY KEY (cache_type, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_last_accessed ON cache_entries (last_accessed);
+    """
+
+    def __init__(self, cache_base_dir: str, db_file: str = "cache.sqlite3", busy_timeout: float = 10.0):
+        Path(cache_base_dir).mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(cache_base_dir) / db_file
+        self.lock = threading.RLock()
+        self.busy_timeout = busy_timeout
+
+        try:
+            self.conn = sqlite3.connect(str(self.db_path), timeout=busy_timeout, check_same_thread=False)
+            self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+            # Running total of stored bytes, kept up to date by every write/delete of this connection
+            # and recomputed when data_version shows a commit from another process
+            self.data_version = None
+            self._sync_stored_size()
+        except sqlite3.Error as e:
+            raise OSError(f"Could not open cache database {self.db_path}: {e}") from e
+
+    def _sync_stored_size(self):
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self.data_version:
+            self.stored_size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            self.data_version = data_version
+
+    def _stored_size_of(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Bytes currently stored for the given (cache_type, key) pairs"""
+        total = 0
+        for pair in pairs:
+            row = self.conn.execute(
+                "SELECT size FROM cache_entries WHERE cache_type = ? AND key = ?", pair).fetchone()
+            if row is not None:
+                total += row[0]
+        return total
+
+    def get_metadata(self, cache_type: str, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT created_time, ttl, size, last_accessed FROM cache_entries WHERE cache_type = ? AND key = ?",
+                (cache_type, key)).fetchone()
+        if row is None:
+            return None
+        return {"created_time": row[0], "ttl": row[1], "size": row[2], "last_accessed": row[3]}
+
+    def read(self, cache_type: str, key: str, include_expired: bool = False):
+        """Return (data, metadata) or None. Raises ValueError on a corrupted entry"""
+        query = ("SELECT data, created_time, ttl, size, last_accessed FROM cache_entries "
+                 "WHERE cache_type = ? AND key = ?")
+        params = (cache_type, key)
+        if not include_expired:
+            query += " AND expires_at >= ?"
+            params += (time.time(),)
+
+        with self.lock:
+            row = self.conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), {"created_time": row[1], "ttl": row[2], "size": row[3], "last_accessed": row[4]}
+
+    def write_many(self, entries: List[Tuple[str, str, Any, Dict[str, Any]]]) -> List[int]:
+        """Write (cache_type, key, data, metadata) entries in a single transaction.
+        Returns the stored size of each entry"""
+        rows = []
+        for cache_type, key, data, meta in entries:
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+            rows.append((cache_type, key, payload, meta["created_time"], meta["ttl"],
+                         meta["created_time"] + meta["ttl"], len(payload.encode('utf-8')),
+                         meta.get("last_accessed", meta["created_time"])))
+
+        with self.lock, self.conn:
+            replaced_size = self._stored_size_of((row[0], row[1]) for row in rows)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(cache_type, key, data, created_time, ttl, expires_at, size, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.stored_size += sum(row[6] for row in rows) - replaced_size
+        return [row[6] for row in rows]
+
+    def delete_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        pairs = list(pairs)
+        with self.lock, self.conn:
+            self.stored_size -= self._stored_size_of(pairs)
+            cursor = self.conn.executemany(
+                "DELETE FROM cache_entries WHERE cache_type = ? AND key = ?", pairs)
+            return cursor.rowcount
+
+    def clear_type(self, cache_type: str) -> int:
+        with self.lock, self.conn:
+            self.stored_size -= self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE cache_type = ?", (cache_type,)).fetchone()[0]
+            return self.conn.execute("DELETE FROM cache_entries WHERE cache_type = ?", (cache_type,)).rowcount
+
+    def delete_expired(self, now: float) -> int:
+        with self.lock, self.conn:
+            self.stored_size -= self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE expires_at < ?", (now,)).fetchone()[0]
+            return self.conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,)).rowcount
+
+    def purge_keys(self, cache_type: str, keep: Callable[[str], bool]) -> int:
+        with self.lock:
+            keys = [row[0] for row in self.conn.execute(
+                "SELECT key FROM cache_entries WHERE cache_type = ?", (cache_type,))]
+        return self.delete_many((cache_type, key) for key in keys if not keep(key))
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT cache_type, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries GROUP BY cache_type").fetchall()
+        return {cache_type: (count, size) for cache_type, count, size in rows}
+
+    def total_size(self) -> int:
+        with self.lock:
+            self._sync_stored_size()
+            return self.stored_size
+
+    def touch_many(self, accesses: Dict[Tuple[str, str], float]):
+        """Record last access times in a single transaction"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE cache_entries SET last_accessed = MAX(last_accessed, ?) WHERE cache_type = ? AND key = ?",
+                [(accessed, cache_type, key) for (cache_type, key), accessed in accesses.items()])
+
+    def lru_entries(self, limit: int) -> List[Tuple[str, str, int]]:
+        """Return up to limit (cache_type, key, size) entries, least recently used first"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT cache_type, key, size FROM cache_entries ORDER BY last_accessed LIMIT ?", (limit,)).fetchall()
+
+    def import_json_layout(self, cache_base_dir: str, cache_types: Iterable[str]) -> int:
+        """One-shot import of the legacy one-file-per-entry layout.
+        Imported files are removed and cache_metadata.json is renamed so the import never runs twice."""
+        legacy = JsonCacheBackend(cache_base_dir, cache_types, lock_timeout=self.busy_timeout)
+        with legacy.file_lock:
+            # Another process sharing the cache_dir may have imported it first
+            if not legacy.metadata_file.exists():
+                return 0
+            return self._import_json_entries(legacy, cache_base_dir)
+
+    def _import_json_entries(self, legacy: JsonCacheBackend, cache_base_dir: str) -> int:
+        legacy.refresh_metadata()
+        entries = []
+        for cache_type, type_metadata in legacy.metadata.items():
+            for key, meta in type_metadata.items():
+                try:
+                    entry = legacy.read(cache_type, key, include_expired=True)
+                except (ValueError, OSError):
+                    continue
+                if entry is not None:
+                    entries.append((cache_type, key, entry[0], {
+                        "created_time": meta.get("created_time", 0),
+                        "ttl": meta.get("ttl", 0),
+                        "last_accessed": meta.get("last_accessed", meta.get("created_time", 0))
+                    }))
+
+        self.write_many(entries)
+
+        for cache_type in legacy.cache_types:
+            cache_dir = Path(cache_base_dir) / cache_type
+            for cache_file in cache_dir.glob("*.json"):
+                cache_file.unlink()
+            try:
+                cache_dir.rmdir()
+            except OSError:
+                pass
+        legacy.metadata_file.replace(legacy.metadata_file.with_name("cache_metadata.json.imported"))
+
+        return len(entries)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
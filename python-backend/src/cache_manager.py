@@ -1,13 +1,78 @@
-import json
-import os
+import functools
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from cache_backends import JsonCacheBackend, SqliteCacheBackend, BACKEND_ERRORS, is_expired
+
+
+def synchronized(method):
+    """Run a CacheManager method under the manager's lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class MemoryTier:
+    """In-process LRU of decoded entries, bounded by entry count and approximate bytes.
+    Values are shared with callers and must be treated as read-only.
+    Not thread-safe on its own: only used under CacheManager.lock."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (cache_type, key) -> (data, expires_at, size)
+        self.size = 0
+        self.evictions = {}
+
+    def get(self, cache_type: str, key: str, now: float):
+        entry = self.entries.get((cache_type, key))
+        if entry is None:
+            return None
+        if entry[1] < now:
+            self.discard(cache_type, key)
+            return None
+
+        self.entries.move_to_end((cache_type, key))
+        return entry[0]
+
+    def put(self, cache_type: str, key: str, data: Any, expires_at: float, size: int):
+        self.discard(cache_type, key)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+
+        self.entries[(cache_type, key)] = (data, expires_at, size)
+        self.size += size
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            (evicted_type, _), (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions[evicted_type] = self.evictions.get(evicted_type, 0) + 1
+
+    def discard(self, cache_type: str, key: str):
+        entry = self.entries.pop((cache_type, key), None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def discard_type(self, cache_type: str):
+        for entry_type, key in [k for k in self.entries if k[0] == cache_type]:
+            self.discard(entry_type, key)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
 
 
 class CacheManager:
     def __init__(self, config_manager):
         self.config_manager = config_manager
+        # Guards the memory tier, counters, pending accesses and the backend (JSON metadata)
+        # so one instance can be shared by request threads and background workers
+        self.lock = threading.RLock()
 
         # Load cache configuration
         cache_config = self.config_manager.get("cache", {})
@@ -15,6 +80,22 @@ class CacheManager:
         self.default_ttl = cache_config.get("default_ttl", 3600 * 24)  # 24 hours
         self.max_cache_size = cache_config.get("max_cache_size", 100 * 1024 * 1024)  # 100MB
         self.enabled = cache_config.get("enabled", True)
+        self.backend_name = cache_config.get("backend", "sqlite")  # "sqlite" or "json" (legacy layout)
+        # Expired entries are kept this long so they can still be served stale while being refreshed
+        self.stale_grace = cache_config.get("stale_grace", 7 * 24 * 3600)  # 7 days
+        # How long a process waits for another one sharing the cache_dir (file lock / SQLite busy timeout)
+        self.lock_timeout = cache_config.get("lock_timeout", 10.0)
+
+        # In-memory tier in front of the backend (write-through)
+        self.memory = MemoryTier(cache_config.get("memory_max_entries", 512),
+                                 cache_config.get("memory_max_size", 32 * 1024 * 1024))
+        self.counters = {}  # cache_type -> {"memory_hits", "disk_hits", "misses"}
+
+        # Size-bounded LRU eviction of the persistent tier
+        self.pending_accesses = {}  # (cache_type, key) -> last access time, flushed in batches
+        self.access_flush_threshold = cache_config.get("access_flush_threshold", 64)
+        self.eviction_batch = cache_config.get("eviction_batch", 32)
+        self.disk_evictions = {}
 
         # Cache types definition
         self.cache_types = {
@@ -24,202 +105,257 @@ class CacheManager:
             "steam_store": "steam_store"
         }
 
+        self.backend = None
         if self.enabled:
-            self.setup_cache_directories()
-            self.metadata = self.load_metadata()
-        else:
-            self.metadata = {}
+            self.setup_backend()
 
-    def setup_cache_directories(self):
-        """Create cache directory structure"""
+    def setup_backend(self):
+        """Open the configured storage backend, importing the legacy JSON layout into SQLite once"""
         try:
-            for cache_type in self.cache_types.values():
-                cache_dir = Path(self.cache_base_dir) / cache_type
-                cache_dir.mkdir(parents=True, exist_ok=True)
-
-            print(f"Cache directories initialized at {self.cache_base_dir}")
-        except OSError as e:
-            print(f"Warning: Could not create cache directories: {e}")
-            self.enabled = False
-
-    def load_metadata(self):
-        """Load cache metadata from disk"""
-        metadata_file = Path(self.cache_base_dir) / "cache_metadata.json"
-
-        try:
-            if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            if self.backend_name == "json":
+                self.backend = JsonCacheBackend(self.cache_base_dir, self.cache_types.values(),
+                                                lock_timeout=self.lock_timeout)
             else:
-                # Initialize empty metadata structure
-                return {cache_type: {} for cache_type in self.cache_types.values()}
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Warning: Could not load cache metadata: {e}")
-            return {cache_type: {} for cache_type in self.cache_types.values()}
-
-    def save_metadata(self):
-        """Save cache metadata to disk"""
-        if not self.enabled:
-            return False
-
-        metadata_file = Path(self.cache_base_dir) / "cache_metadata.json"
-
-        try:
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, indent=2)
-            return True
-        except OSError as e:
-            print(f"Warning: Could not save cache metadata: {e}")
-            return False
-
-    def get_cache_file_path(self, cache_type: str, key: str) -> Path:
-        """Generate cache file path for given type and key"""
-        safe_key = str(key).replace('/', '_').replace('\\', '_')
-        return Path(self.cache_base_dir) / cache_type / f"{safe_key}.json"
+                self.backend = SqliteCacheBackend(self.cache_base_dir, busy_timeout=self.lock_timeout)
+                if (Path(self.cache_base_dir) / "cache_metadata.json").exists():
+                    imported = self.backend.import_json_layout(self.cache_base_dir, self.cache_types.values())
+                    print(f"Imported {imported} legacy cache entries into {self.backend.db_path}")
+
+            print(f"Cache ({self.backend.name}) initialized at {self.cache_base_dir}")
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not initialize cache backend: {e}")
+            self.enabled = False
 
+    @synchronized
     def is_cache_expired(self, cache_type: str, key: str) -> bool:
         """Check if cache entry is expired"""
-        if not self.enabled or cache_type not in self.metadata:
+        if not self.enabled:
             return True
 
-        key_str = str(key)
-        if key_str not in self.metadata[cache_type]:
+        try:
+            entry_metadata = self.backend.get_metadata(cache_type, str(key))
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not read cache metadata: {e}")
             return True
 
-        entry_metadata = self.metadata[cache_type][key_str]
-        created_time = entry_metadata.get("created_time", 0)
-        ttl = entry_metadata.get("ttl", self.default_ttl)
+        return entry_metadata is None or is_expired(entry_metadata, time.time())
 
-        return (time.time() - created_time) > ttl
+    def _count_access(self, cache_type: str, counter: str):
+        type_counters = self.counters.setdefault(cache_type, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        type_counters[counter] += 1
 
+    @synchronized
     def get_cache(self, cache_type: str, key: str) -> Optional[Dict[str, Any]]:
-        """Retrieve data from cache"""
-        if not self.enabled or self.is_cache_expired(cache_type, key):
+        """Retrieve data from cache (memory tier first, then the persistent backend)"""
+        if not self.enabled:
             return None
 
-        cache_file = self.get_cache_file_path(cache_type, key)
+        key_str = str(key)
+        now = time.time()
+        data = self.memory.get(cache_type, key_str, now)
+        if data is not None:
+            self._count_access(cache_type, "memory_hits")
+            self.record_access(cache_type, key_str, now)
+            return data
 
         try:
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Warning: Could not read cache file {cache_file}: {e}")
+            entry = self.backend.read(cache_type, key_str)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not read cache entry {cache_type}/{key}: {e}")
             # Remove corrupted cache entry
             self.invalidate_cache(cache_type, key)
+            entry = None
+
+        if entry is None:
+            self._count_access(cache_type, "misses")
+            return None
+
+        data, meta = entry
+        self._count_access(cache_type, "disk_hits")
+        self.record_access(cache_type, key_str, now)
+        self.memory.put(cache_type, key_str, data, meta["created_time"] + meta["ttl"], meta.get("size", 0))
+        return data
+
+    @synchronized
+    def get_cache_entry(self, cache_type: str, key: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Retrieve (data, is_stale), including expired entries not yet cleaned up (stale-while-revalidate)"""
+        data = self.get_cache(cache_type, key)
+        if data is not None:
+            return data, False
+        if not self.enabled:
+            return None
+
+        try:
+            entry = self.backend.read(cache_type, str(key), include_expired=True)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not read cache entry {cache_type}/{key}: {e}")
+            return None
+
+        return (entry[0], True) if entry else None
+
+    @synchronized
+    def get_cache_metadata(self, cache_type: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return created_time / ttl / size / last_accessed of an entry, or None"""
+        if not self.enabled:
+            return None
 
-        return None
+        try:
+            return self.backend.get_metadata(cache_type, str(key))
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not read cache metadata: {e}")
+            return None
 
     def set_cache(self, cache_type: str, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """Store data in cache"""
+        return self.set_cache_many(cache_type, {key: data}, ttl)
+
+    @synchronized
+    def set_cache_many(self, cache_type: str, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None) -> bool:
+        """Store several entries of one cache type in a single atomic batch"""
         if not self.enabled:
             return False
 
-        cache_file = self.get_cache_file_path(cache_type, key)
-        ttl = ttl or self.default_ttl
+        now = time.time()
+        meta = {"created_time": now, "ttl": ttl or self.default_ttl, "last_accessed": now}
 
+        entries = [(cache_type, str(key), data, meta) for key, data in items.items()]
         try:
-            # Save data to file
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            # Update metadata
-            key_str = str(key)
-            if cache_type not in self.metadata:
-                self.metadata[cache_type] = {}
-
-            self.metadata[cache_type][key_str] = {
-                "created_time": time.time(),
-                "ttl": ttl,
-                "size": cache_file.stat().st_size,
-                "last_accessed": time.time()
-            }
+            sizes = self.backend.write_many(entries)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not write cache entries of type '{cache_type}': {e}")
+            for _, key_str, _, _ in entries:
+                self.memory.discard(cache_type, key_str)
+            return False
 
-            self.save_metadata()
-            return True
+        for (_, key_str, data, _), size in zip(entries, sizes):
+            self.memory.put(cache_type, key_str, data, now + meta["ttl"], size)
 
-        except OSError as e:
-            print(f"Warning: Could not write cache file {cache_file}: {e}")
-            return False
+        self.enforce_size_limit()
+        return True
+
+    @synchronized
+    def record_access(self, cache_type: str, key: str, accessed: float):
+        """Remember a read for LRU ordering; access times are written to the backend in batches"""
+        self.pending_accesses[(cache_type, key)] = accessed
+        if len(self.pending_accesses) >= self.access_flush_threshold:
+            self.flush_accesses()
 
+    @synchronized
+    def flush_accesses(self):
+        """Write pending last_accessed updates to the backend"""
+        if not self.pending_accesses:
+            return
+
+        accesses, self.pending_accesses = self.pending_accesses, {}
+        try:
+            self.backend.touch_many(accesses)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not record cache accesses: {e}")
+
+    @synchronized
+    def enforce_size_limit(self) -> int:
+        """Evict least-recently-used entries across all types while the persistent tier exceeds max_cache_size.
+        Evicts at most eviction_batch entries per call, down to 90% of the budget, so each write pays a bounded cost."""
+        if not self.enabled or not self.max_cache_size:
+            return 0
+
+        try:
+            excess = self.backend.total_size() - self.max_cache_size
+            if excess <= 0:
+                return 0
+
+            self.flush_accesses()
+            excess += self.max_cache_size // 10
+
+            victims = []
+            for cache_type, key, size in self.backend.lru_entries(self.eviction_batch):
+                victims.append((cache_type, key))
+                excess -= size
+                if excess <= 0:
+                    break
+
+            self.backend.delete_many(victims)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not evict cache entries: {e}")
+            return 0
+
+        for cache_type, key in victims:
+            self.memory.discard(cache_type, key)
+            self.disk_evictions[cache_type] = self.disk_evictions.get(cache_type, 0) + 1
+
+        return len(victims)
+
+    @synchronized
     def invalidate_cache(self, cache_type: str, key: str) -> bool:
         """Remove specific cache entry"""
         if not self.enabled:
             return False
 
-        cache_file = self.get_cache_file_path(cache_type, key)
-        key_str = str(key)
-
+        self.memory.discard(cache_type, str(key))
         try:
-            # Remove file if exists
-            if cache_file.exists():
-                cache_file.unlink()
-
-            # Remove from metadata
-            if cache_type in self.metadata and key_str in self.metadata[cache_type]:
-                del self.metadata[cache_type][key_str]
-                self.save_metadata()
-
+            self.backend.delete_many([(cache_type, str(key))])
             return True
-
-        except OSError as e:
+        except BACKEND_ERRORS as e:
             print(f"Warning: Could not invalidate cache entry: {e}")
             return False
 
+    @synchronized
     def clear_cache_type(self, cache_type: str) -> int:
         """Clear all cache entries of specific type"""
         if not self.enabled or cache_type not in self.cache_types.values():
             return 0
 
-        cache_dir = Path(self.cache_base_dir) / cache_type
-        removed_count = 0
-
+        self.memory.discard_type(cache_type)
         try:
-            if cache_dir.exists():
-                for cache_file in cache_dir.glob("*.json"):
-                    cache_file.unlink()
-                    removed_count += 1
-
-            # Clear metadata
-            if cache_type in self.metadata:
-                self.metadata[cache_type] = {}
-                self.save_metadata()
-
+            removed_count = self.backend.clear_type(cache_type)
             print(f"Cleared {removed_count} cache entries of type '{cache_type}'")
             return removed_count
-
-        except OSError as e:
+        except BACKEND_ERRORS as e:
             print(f"Warning: Could not clear cache type '{cache_type}': {e}")
-            return removed_count
+            return 0
 
-    def cleanup_expired(self) -> int:
-        """Remove all expired cache entries"""
-        if not self.enabled:
+    @synchronized
+    def purge_cache_keys(self, cache_type: str, keep: Callable[[str], bool]) -> int:
+        """Remove entries of a cache type whose key is rejected by keep(), plus orphaned files"""
+        if not self.enabled or cache_type not in self.cache_types.values():
             return 0
 
-        removed_count = 0
-        current_time = time.time()
+        self.memory.discard_type(cache_type)
+        try:
+            removed_count = self.backend.purge_keys(cache_type, keep)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not purge cache type '{cache_type}': {e}")
+            return 0
 
-        for cache_type in self.metadata:
-            expired_keys = []
+        if removed_count > 0:
+            print(f"Purged {removed_count} stale cache entries of type '{cache_type}'")
 
-            for key, entry_metadata in self.metadata[cache_type].items():
-                created_time = entry_metadata.get("created_time", 0)
-                ttl = entry_metadata.get("ttl", self.default_ttl)
+        return removed_count
 
-                if (current_time - created_time) > ttl:
-                    expired_keys.append(key)
+    @synchronized
+    def clear_cache(self) -> int:
+        """Clear every cache type, both tiers"""
+        self.memory.clear()
+        return sum(self.clear_cache_type(cache_type) for cache_type in self.cache_types.values())
 
-            # Remove expired entries
-            for key in expired_keys:
-                if self.invalidate_cache(cache_type, key):
-                    removed_count += 1
+    @synchronized
+    def cleanup_expired(self) -> int:
+        """Remove cache entries expired for longer than stale_grace"""
+        if not self.enabled:
+            return 0
+
+        try:
+            removed_count = self.backend.delete_expired(time.time() - self.stale_grace)
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not clean up expired cache entries: {e}")
+            return 0
 
         if removed_count > 0:
             print(f"Cleaned up {removed_count} expired cache entries")
 
         return removed_count
 
+    @synchronized
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         if not self.enabled:
@@ -227,19 +363,39 @@ class CacheManager:
 
         stats = {
             "enabled": True,
+            "backend": self.backend.name,
             "total_files": 0,
             "total_size": 0,
-            "by_type": {}
+            "max_size": self.max_cache_size,
+            "by_type": {},
+            "memory": {
+                "entries": len(self.memory.entries),
+                "size": self.memory.size,
+                "max_entries": self.memory.max_entries,
+                "max_size": self.memory.max_bytes
+            }
         }
 
-        for cache_type in self.metadata:
-            type_files = len(self.metadata[cache_type])
-            type_size = sum(entry.get("size", 0) for entry in self.metadata[cache_type].values())
+        try:
+            backend_stats = self.backend.stats()
+        except BACKEND_ERRORS as e:
+            print(f"Warning: Could not read cache statistics: {e}")
+            backend_stats = {}
+
+        for cache_type in self.cache_types.values():
+            type_files, type_size = backend_stats.get(cache_type, (0, 0))
+
+            type_counters = self.counters.get(cache_type, {})
 
             stats["by_type"][cache_type] = {
                 "files": type_files,
                 "size": type_size,
-                "size_mb": round(type_size / (1024 * 1024), 2)
+                "size_mb": round(type_size / (1024 * 1024), 2),
+                "memory_hits": type_counters.get("memory_hits", 0),
+                "disk_hits": type_counters.get("disk_hits", 0),
+                "misses": type_counters.get("misses", 0),
+                "evictions": self.memory.evictions.get(cache_type, 0),
+                "disk_evictions": self.disk_evictions.get(cache_type, 0)
             }
 
             stats["total_files"] += type_files
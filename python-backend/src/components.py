@@ -0,0 +1,136 @@
+import threading
+
+from config_manager import ConfigManager
+
+
+class Components:
+    """Composants de l'API créés à la première utilisation, autour d'un seul ConfigManager.
+    Importer ce module ne fait aucune I/O : les modules des composants (et requests avec eux)
+    ne sont importés qu'à la création du premier composant qui en a besoin."""
+
+    def __init__(self, config_file=None):
+        self.config_file = config_file
+        self.lock = threading.RLock()  # réentrant : un composant peut en créer un autre
+        self.instances = {}
+
+    def _get(self, name, factory):
+        instance = self.instances.get(name)
+        if instance is None:
+            with self.lock:
+                instance = self.instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self.instances[name] = instance
+        return instance
+
+    def is_created(self, name):
+        return name in self.instances
+
+    def ensure(self, *names):
+        """Crée les composants nommés s'ils n'existent pas encore (sans attendre leur première utilisation)"""
+        for name in names:
+            if not isinstance(getattr(type(self), name, None), property):
+                raise AttributeError(f"Composant inconnu : {name}")
+            getattr(self, name)
+
+    @property
+    def config_manager(self):
+        return self._get("config_manager", lambda: ConfigManager(self.config_file))
+
+    def section(self, name):
+        return self.config_manager.get(name, {})
+
+    @property
+    def achievement_parser(self):
+        def create():
+            from achievement_parser import AchievementParser
+            return AchievementParser(config_manager=self.config_manager)
+        return self._get("achievement_parser", create)
+
+    @property
+    def game_detector(self):
+        def create():
+            from game_detector import GameDetector
+            return GameDetector(cache_manager=self.achievement_parser.cache_manager,
+                                http_client=self.achievement_parser.http_client,
+                                config_manager=self.config_manager)
+        return self._get("game_detector", create)
+
+    @property
+    def enrichment_pipeline(self):
+        def create():
+            # Enrichissement parallèle des jeux pour /api/games
+            from enrichment_pipeline import EnrichmentPipeline
+            config = self.section("enrichment")
+            return EnrichmentPipeline(
+                self.achievement_parser,
+                max_workers=config.get("max_workers", 8),
+                deadline=config.get("deadline", 5.0),
+                host_limits=config.get("host_limits")
+            )
+        return self._get("enrichment_pipeline", create)
+
+    @property
+    def background_refresher(self):
+        def create():
+            # Rafraîchissement en arrière-plan (stale-while-revalidate), branché dès sa création
+            from background_refresher import BackgroundRefresher
+            config = self.section("refresh")
+            return BackgroundRefresher(
+                self.achievement_parser, self.game_detector,
+                schema_interval=config.get("schema_interval", 7 * 24 * 3600),
+                percentages_interval=config.get("percentages_interval", 6 * 3600),
+                check_interval=config.get("check_interval", 60),
+                workers=config.get("workers", 2)
+            ).attach()
+        return self._get("background_refresher", create)
+
+    @property
+    def batch_executor(self):
+        def create():
+            # Résolution parallèle des jeux pour /api/achievements:batch
+            from concurrent.futures import ThreadPoolExecutor
+            return ThreadPoolExecutor(max_workers=self.section("batch").get("max_workers", 8),
+                                      thread_name_prefix="batch")
+        return self._get("batch_executor", create)
+
+    @property
+    def batch_max_app_ids(self):
+        return self.section("batch").get("max_app_ids", 500)
+
+    @property
+    def library_analytics(self):
+        def create():
+            # Analyses transversales de la bibliothèque (table en colonnes)
+            from library_analytics import LibraryAnalytics
+            return LibraryAnalytics(
+                self.achievement_parser, self.game_detector,
+                refresh_interval=self.section("analytics").get("refresh_interval", 5.0)
+            )
+        return self._get("library_analytics", create)
+
+    @property
+    def achievement_watcher(self):
+        def create():
+            # Surveillance des fichiers de succès (démarrée au premier client de /api/events)
+            from achievement_watcher import AchievementWatcher
+            config = self.section("watcher")
+            return AchievementWatcher(
+                self.achievement_parser, self.game_detector,
+                debounce=config.get("debounce", 0.5),
+                poll_interval=config.get("poll_interval", 2.0),
+                backend=config.get("backend", "auto")
+            )
+        return self._get("achievement_watcher", create)
+
+    @property
+    def response_compressor(self):
+        def create():
+            # Compression gzip / brotli des réponses JSON au-dessus d'un seuil
+            from response_pipeline import ResponseCompressor
+            return ResponseCompressor.from_config(self.section("responses"))
+        return self._get("response_compressor", create)
+
+    def warm_up(self):
+        """Crée les composants principaux (appelé en arrière-plan une fois le serveur lancé)"""
+        self.ensure("background_refresher", "enrichment_pipeline")
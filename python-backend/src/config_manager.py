@@ -39,7 +39,8 @@ class ConfigManager:
             "achievements": {
                 "fallback_beautify": True,
                 "show_hidden": True,
-                "sort_by_percentage": True
+                "sort_by_percentage": True,
+                "steamdb_parser": "auto"  # "auto" (lxml si installé), "lxml" ou "html.parser"
             },
             "debug": {
                 "verbose_mode": False,
@@ -48,9 +49,59 @@ class ConfigManager:
             "cache": {  # ← NOUVEAU
                 "enabled": True,
                 "cache_dir": "./data/cache",
+                "backend": "sqlite",  # "sqlite" (single file) or "json" (one file per entry)
+                "memory_max_entries": 512,  # in-process LRU tier
+                "memory_max_size": 33554432,  # 32MB
                 "default_ttl": 86400,  # 24 hours
                 "max_cache_size": 104857600,  # 100MB
-                "cleanup_on_start": True
+                "cleanup_on_start": True,
+                "stale_grace": 604800,  # expired entries kept 7 days to be served stale
+                "lock_timeout": 10.0  # seconds to wait for another process sharing cache_dir
+            },
+            "refresh": {
+                "schema_interval": 604800,  # 7 jours
+                "percentages_interval": 21600,  # 6 heures
+                "check_interval": 60,
+                "workers": 2
+            },
+            "enrichment": {
+                "max_workers": 8,
+                "deadline": 5.0,  # secondes ; au-delà les jeux sont renvoyés "pending"
+                "host_limits": {"api.steampowered.com": 4, "steamdb.info": 2}
+            },
+            "server": {  # serve.py (production)
+                "host": "localhost",
+                "port": 5000,
+                "threads": 16  # SSE : chaque client /api/events occupe un thread
+            },
+            "responses": {
+                "compress_min_size": 1024,  # octets ; en dessous, les réponses JSON partent telles quelles
+                "gzip_level": 1,  # rapide ; 6 donne ~30 % d'octets en moins pour ~2,5x le temps
+                "brotli_quality": 4  # si le module brotli est installé
+            },
+            "analytics": {
+                "refresh_interval": 5.0  # secondes entre deux vérifications des jeux modifiés
+            },
+            "batch": {
+                "max_workers": 8,  # jeux résolus en parallèle par /api/achievements:batch
+                "max_app_ids": 500
+            },
+            "http": {
+                "pool_size": 16,
+                "backoff_base": 0.5,  # secondes, doublé à chaque essai (avec jitter)
+                "backoff_max": 30.0,
+                "rate_limits": {  # hôte -> [requêtes par seconde, rafale]
+                    "api.steampowered.com": [10, 20],
+                    "store.steampowered.com": [1, 10],
+                    "steamdb.info": [1, 3]
+                },
+                "breaker_threshold": 5,  # échecs consécutifs avant de couper l'hôte
+                "breaker_cooldown": 60.0
+            },
+            "watcher": {
+                "backend": "auto",  # "auto" (inotify sous Linux), "inotify" ou "polling"
+                "debounce": 0.5,
+                "poll_interval": 2.0
             },
             "paths": {
                 "output_dir": "./output"
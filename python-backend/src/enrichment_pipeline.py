@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from log_manager import get_logger
+
+logger = get_logger(__name__)
+
+STEAM_API_HOST = "api.steampowered.com"
+STEAMDB_HOST = "steamdb.info"
+
+
+class EnrichmentPipeline:
+    """Enrichit les jeux détectés en parallèle (succès locaux + total obtenable).
+    Limite de concurrence par hôte distant et délai global : les jeux non terminés à l'échéance
+    sont rendus partiels ("pending") et leur récupération continue en arrière-plan pour l'appel suivant."""
+
+    def __init__(self, achievement_parser, max_workers=8, deadline=5.0, host_limits=None):
+        self.achievement_parser = achievement_parser
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrichment")
+
+        host_limits = host_limits or {STEAM_API_HOST: 4, STEAMDB_HOST: 2}
+        self.host_semaphores = {host: threading.BoundedSemaphore(limit) for host, limit in host_limits.items()}
+
+        self.lock = threading.Lock()
+        self.in_flight = {}  # app_id -> Future, un seul calcul en cours par jeu
+
+    def _host_for(self):
+        """Hôte distant interrogé par get_best_achievements_auto selon la présence d'une clé API"""
+        return STEAM_API_HOST if self.achievement_parser.steam_api_key else STEAMDB_HOST
+
+    def _enrich(self, app_id):
+        parser = self.achievement_parser
+        local_achievements_count = parser.get_local_achievements_count(app_id)
+
+        # Résumé matérialisé : ni copie ni tri de la liste des succès quand rien n'a changé.
+        # Créneau de l'hôte distant seulement si un enregistrement manque (sinon aucun appel réseau :
+        # un enregistrement expiré est servi tel quel et rafraîchi par le BackgroundRefresher)
+        semaphore = self.host_semaphores.get(self._host_for())
+        if semaphore is None or parser.get_achievements_version(app_id) is not None:
+            summary = parser.get_game_summary(app_id)
+        else:
+            with semaphore:
+                summary = parser.get_game_summary(app_id)
+
+        return {
+            'local_achievements_count': local_achievements_count,
+            'total_obtenable_achievements': summary.total,
+            'pending': False
+        }
+
+    def _submit(self, app_id):
+        with self.lock:
+            future = self.in_flight.get(app_id)
+            if future is not None:
+                return future
+            future = self.executor.submit(self._enrich, app_id)
+            self.in_flight[app_id] = future
+
+        # Hors du verrou : un calcul déjà terminé (jeu en cache) exécute le rappel tout de suite, dans ce thread
+        future.add_done_callback(lambda done, app_id=app_id: self._forget(app_id, done))
+        return future
+
+    def _forget(self, app_id, future):
+        with self.lock:
+            if self.in_flight.get(app_id) is future:
+                del self.in_flight[app_id]
+
+    def enrich(self, app_ids, deadline=None):
+        """Retourne {app_id: données} ; les jeux hors délai ont pending=True et un total à None"""
+        deadline = self.deadline if deadline is None else deadline
+        started = time.monotonic()
+        futures = {app_id: self._submit(app_id) for app_id in app_ids}
+        wait(futures.values(), timeout=deadline)
+
+        results = {}
+        for app_id, future in futures.items():
+            if not future.done():
+                results[app_id] = {
+                    'local_achievements_count': self.achievement_parser.get_local_achievements_count(app_id),
+                    'total_obtenable_achievements': None,
+                    'pending': True
+                }
+                continue
+
+            try:
+                results[app_id] = future.result()
+            except Exception as e:
+                logger.error(f"Enrichissement impossible pour {app_id} : {e}", exc_info=True)
+                results[app_id] = {
+                    'local_achievements_count': 0,
+                    'total_obtenable_achievements': 0,
+                    'pending': False,
+                    'failed': True  # résultat provisoire, à ne pas considérer comme définitif
+                }
+
+        pending = sum(1 for data in results.values() if data['pending'])
+        if pending:
+            logger.info(f"{pending}/{len(results)} jeux encore en cours après {time.monotonic() - started:.2f}s")
+        return results
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,88 +1,337 @@
 import os
 import requests
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from pywin.scintilla.config import ConfigManager
+from config_manager import ConfigManager
+from cache_manager import CacheManager
+from steam_http import SteamHttpClient
+from log_manager import get_logger
 
-import config_manager
+logger = get_logger(__name__)
+
+# Durée de vie des noms de jeux dans le cache "games" (30 jours)
+GAME_NAME_TTL = 30 * 24 * 3600
+
+# Nouvel essai d'un nom introuvable ou en erreur : délai doublé à chaque échec, plafonné
+NAME_RETRY_DELAY = 30
+NAME_RETRY_MAX = 3600
 
 
 class GameDetector:
-    def __init__(self):
-        """Initialise le scanner avec la config du fichier JSON"""
+    def __init__(self, cache_manager=None, http_client=None, config_manager=None):
+        """Initialise le scanner avec la config du fichier JSON (ConfigManager partagé si fourni)"""
 
-        self.config_manager = config_manager.ConfigManager()
+        self.config_manager = config_manager or ConfigManager()
         self.known_locations = self.config_manager.known_locations
 
+        # Cache persistant des noms (type "games"), partagé avec AchievementParser si fourni
+        self.cache_manager = cache_manager or CacheManager(self.config_manager)
+
+        steam_api_config = self.config_manager.get("steam_api", {})
+        self.name_workers = steam_api_config.get("name_workers", 8)
+
+        # Client HTTP (pool, limiteur par hôte, backoff), partagé avec AchievementParser si fourni
+        self.http_client = http_client or SteamHttpClient.from_config(self.config_manager)
+
         self.games_id = []
         self.games = {}
         self.games_sources = {}
 
+        # Index de la bibliothèque : mtime (ns) de chaque dossier de base / d'équipe déjà listé,
+        # et jeux trouvés par dossier d'équipe. Permet de ne relister que les dossiers modifiés.
+        self.library_index = {}
+        self.team_folders = {}
+
+        # Protège l'index (games_id, games_sources, team_folders) partagé entre threads de requêtes ;
+        # les lecteurs passent par get_games_snapshot()
+        self.lock = threading.RLock()
+
+        # Version de la liste des jeux : incrémentée à chaque ajout, retrait ou nom résolu.
+        # L'époque distingue deux exécutions (un compteur seul repart de 0 au redémarrage)
+        self.library_epoch = f"{time.time_ns():x}"
+        self.library_version = 0
+
+        # Résolution réseau des noms inconnus : un seul thread en arrière-plan à la fois.
+        # Échecs : app_id -> (nombre d'échecs, prochain essai), le jeu reste "pending" d'ici là
+        self.naming_in_progress = False
+        self.name_failures = {}
+
         #print(f"🔧 GameDetector initialisé avec {len(self.known_locations)} emplacements")
 
     def scan_all_locations(self):
-        """Scanne tous les emplacements connus pour trouver des jeux"""
+        """Scanne tous les emplacements connus pour trouver des jeux.
+        Incrémental : seuls les dossiers dont le mtime a changé depuis le dernier scan sont relistés."""
         #print(f"🔍 Scan de {len(self.known_locations)} emplacements...")
+        with self.lock:
+            seen_team_paths = set()
 
-        for location_name, config in self.known_locations.items():
-            #print(f"\n📁 Scanning {location_name}")
-            base_path = os.path.expanduser(config["base_path"])  # Gère les ~ automatiquement
+            for location_name, config in self.known_locations.items():
+                #print(f"\n📁 Scanning {location_name}")
+                base_path = os.path.expanduser(config["base_path"])  # Gère les ~ automatiquement
 
-            if not os.path.exists(base_path):
-                #print(f"    ❌ Base path doesn't exist: {base_path}")
-                continue
+                base_mtime = self._get_dir_mtime(base_path)
+                if base_mtime is None:
+                    #print(f"    ❌ Base path doesn't exist: {base_path}")
+                    self.library_index.pop(base_path, None)
+                    continue
+                base_unchanged = self.library_index.get(base_path) == base_mtime
+                self.library_index[base_path] = base_mtime
 
-            for team in config["teams"]:
-                team_path = os.path.join(base_path, team)
-                #print(f"    🔍 Scan de : {team}")
-                self._scan_team_folder(team_path, team, location_name)
+                for team in config["teams"]:
+                    team_path = os.path.join(base_path, team)
+                    seen_team_paths.add(team_path)
+                    # Base inchangée => aucun dossier d'équipe n'a été créé ni supprimé
+                    if base_unchanged and team_path not in self.team_folders:
+                        continue
+                    #print(f"    🔍 Scan de : {team}")
+                    self._scan_team_folder(team_path, team, location_name)
+
+            # Dossiers d'équipe qui ne font plus partie de la configuration
+            for team_path in list(self.team_folders):
+                if team_path not in seen_team_paths:
+                    self._forget_team_folder(team_path)
+
+            # Noms déjà connus (mémoire ou cache "games") : appliqués tout de suite
+            unnamed = [app_id for app_id, source in self.games_sources.items() if not source['name']]
+            for app_id in unnamed:
+                name = self._get_known_name(app_id)
+                if name is not None:
+                    self.games_sources[app_id]['name'] = name
+                    self.library_version += 1
+
+            unknown = bool(self._names_to_resolve(1))
+
+        # Les autres passent par le Steam Store en arrière-plan : le scan ne bloque jamais sur le réseau,
+        # les jeux sans nom sont rendus "pending" jusqu'à leur résolution
+        if unknown:
+            self._schedule_name_resolution()
+
+    def _names_to_resolve(self, limit):
+        """Jeux sans nom à interroger maintenant (hors de ceux en attente d'un nouvel essai), sous self.lock"""
+        now = time.monotonic()
+        unnamed = [app_id for app_id, source in self.games_sources.items()
+                   if not source['name'] and self.name_failures.get(app_id, (0, 0))[1] <= now]
+        return unnamed[:limit]
+
+    def _schedule_name_resolution(self):
+        with self.lock:
+            if self.naming_in_progress:
+                return
+            self.naming_in_progress = True
+        threading.Thread(target=self._resolve_unnamed_games, name="game-names", daemon=True).start()
+
+    def _resolve_unnamed_games(self):
+        """Résout les jeux encore sans nom par petits lots (appliqués au fur et à mesure), jusqu'au dernier"""
+        try:
+            while True:
+                with self.lock:
+                    unnamed = self._names_to_resolve(self.name_workers)
+                    if not unnamed:
+                        self.naming_in_progress = False
+                        return
+
+                names = self.resolve_game_names(unnamed)
+                with self.lock:
+                    for app_id in unnamed:
+                        if names[app_id] is None:
+                            # Erreur réseau, disjoncteur ouvert ou jeu absent du Store : nouvel essai
+                            # lors d'un scan ultérieur, après un délai croissant
+                            failures = self.name_failures.get(app_id, (0, 0))[0] + 1
+                            delay = min(NAME_RETRY_DELAY * 2 ** (failures - 1), NAME_RETRY_MAX)
+                            self.name_failures[app_id] = (failures, time.monotonic() + delay)
+                            continue
+                        self.name_failures.pop(app_id, None)
+                        if app_id in self.games_sources and not self.games_sources[app_id]['name']:
+                            self.games_sources[app_id]['name'] = names[app_id]
+                            self.library_version += 1
+        except Exception:
+            with self.lock:
+                self.naming_in_progress = False
+            raise
+
+    def get_library_version(self):
+        """Validateur de la liste des jeux (époque, version), change dès que get_games_snapshot() change"""
+        with self.lock:
+            return self.library_epoch, self.library_version
+
+    def get_games_snapshot(self):
+        """Copie cohérente de games_sources (app_id -> infos), sûre à parcourir pendant un scan"""
+        with self.lock:
+            return {app_id: dict(source) for app_id, source in self.games_sources.items()}
+
+    def _get_dir_mtime(self, path):
+        """Retourne le mtime (ns) d'un dossier, ou None s'il n'existe pas"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
 
     def _scan_team_folder(self, team_path, team_name, location_name):
-        """Scanne un dossier d'équipe pour trouver des jeux"""
-        if os.path.exists(team_path):
-            #print(f"      ✅ Found: {team_path}")
-            for item in os.listdir(team_path):
-                if self._is_valid_game_id(item):
-                    if item not in self.games_id:
-                        self.games_id.append(item)
-                        self.games_sources[item] = {
-                            'name': self.get_game_name(item),
-                            'path': os.path.join(team_path, item),
-                            'team': team_name,
-                            'location': location_name
-                        }
-                        #print(f"        🎮 Game found -> {item} : {self.get_game_name(item)} ({team_name})")
-        else:
+        """Scanne un dossier d'équipe pour trouver des jeux (ne le reliste que si son mtime a changé)"""
+        team_mtime = self._get_dir_mtime(team_path)
+        if team_mtime is None:
             #print(f"      ❌ Team folder doesn't exist: {team_path}")
+            self._forget_team_folder(team_path)
             return
 
+        if team_path in self.team_folders and self.library_index.get(team_path) == team_mtime:
+            return
+
+        #print(f"      ✅ Found: {team_path}")
+        try:
+            found = {item for item in os.listdir(team_path) if self._is_valid_game_id(item)}
+        except OSError:
+            self._forget_team_folder(team_path)
+            return
+
+        previous = self.team_folders.get(team_path, {}).get('games', set())
+        self.library_index[team_path] = team_mtime
+        self.team_folders[team_path] = {'team': team_name, 'location': location_name, 'games': found}
+
+        for item in previous - found:
+            self._remove_game(item, team_path)
+
+        for item in sorted(found - previous):
+            if item not in self.games_id:
+                self._add_game(item, team_path, team_name, location_name)
+                #print(f"        🎮 Game found -> {item} : {self.get_game_name(item)} ({team_name})")
+
+    def _forget_team_folder(self, team_path):
+        """Retire de l'index un dossier d'équipe disparu et les jeux qu'il fournissait"""
+        self.library_index.pop(team_path, None)
+        folder = self.team_folders.pop(team_path, None)
+        if folder:
+            for item in folder['games']:
+                self._remove_game(item, team_path)
+
+    def _add_game(self, app_id, team_path, team_name, location_name):
+        """Enregistre un jeu trouvé dans un dossier d'équipe"""
+        self.games_id.append(app_id)
+        self.games_sources[app_id] = {
+            'name': self.games.get(app_id),
+            'path': os.path.join(team_path, app_id),
+            'team': team_name,
+            'location': location_name
+        }
+        self.library_version += 1
+
+    def _remove_game(self, app_id, team_path):
+        """Retire un jeu fourni par team_path ; bascule sur un autre dossier d'équipe qui le contient encore"""
+        source = self.games_sources.get(app_id)
+        if not source or source['path'] != os.path.join(team_path, app_id):
+            return
+
+        del self.games_sources[app_id]
+        self.games_id.remove(app_id)
+        self.library_version += 1
+
+        for other_path, folder in self.team_folders.items():
+            if other_path != team_path and app_id in folder['games']:
+                self._add_game(app_id, other_path, folder['team'], folder['location'])
+                return
+
+    def find_game(self, app_id):
+        """Localise un seul jeu sans rescanner la bibliothèque : index app_id -> dossier,
+        sinon un stat par dossier d'équipe connu. Retourne ses infos (games_sources) ou None."""
+        app_id = str(app_id)
+        with self.lock:
+            source = self._find_game(app_id)
+            return dict(source) if source else None
+
+    def _find_game(self, app_id):
+        source = self.games_sources.get(app_id)
+        if source and os.path.isdir(source['path']):
+            return source
+
+        for location_name, config in self.known_locations.items():
+            base_path = os.path.expanduser(config["base_path"])
+            for team in config["teams"]:
+                team_path = os.path.join(base_path, team)
+                if not os.path.isdir(os.path.join(team_path, app_id)):
+                    continue
+
+                if source:
+                    self.games_id.remove(app_id)
+                    del self.games_sources[app_id]
+                    self.library_version += 1
+                self._add_game(app_id, team_path, team, location_name)
+                if team_path in self.team_folders:
+                    self.team_folders[team_path]['games'].add(app_id)
+                return self.games_sources[app_id]
+
+        return None
+
     def _is_valid_game_id(self, folder_name):
         """Vérifie si un nom de dossier est un ID de jeu valide"""
         return folder_name.isdigit()
 
     def get_game_name(self, app_id):
-        """Récupère le nom d'un jeu Steam à partir de son ID"""
-        url = f"https://store.steampowered.com/api/appdetails?appids={app_id}"
+        """Récupère le nom d'un jeu Steam à partir de son ID (None s'il n'a pas pu être résolu)"""
+        return self.resolve_game_names([app_id])[app_id]
+
+    def resolve_game_names(self, app_ids):
+        """Résout les noms de plusieurs jeux en parallèle (None pour ceux qui n'ont pas pu l'être).
+        Les noms déjà connus (mémoire ou cache "games") ne repassent jamais par le réseau."""
+        names = {}
+        pending = []
+        for app_id in dict.fromkeys(app_ids):
+            name = self._get_known_name(app_id)
+            if name is None:
+                pending.append(app_id)
+            else:
+                names[app_id] = name
+
+        if pending:
+            workers = max(1, min(self.name_workers, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._fetch_game_name, pending))
+
+            resolved = {}
+            for app_id, name in zip(pending, results):
+                names[app_id] = name
+                if name is not None:
+                    self.games[app_id] = name
+                    resolved[str(app_id)] = {"name": name}
+
+            if resolved:
+                self.cache_manager.set_cache_many("games", resolved, ttl=GAME_NAME_TTL)
+
+        return names
+
+    def _get_known_name(self, app_id):
+        """Retourne le nom d'un jeu s'il est déjà connu (mémoire puis cache disque), sinon None"""
+        if app_id in self.games:
+            return self.games[app_id]
+
+        cached = self.cache_manager.get_cache("games", str(app_id))
+        if cached and cached.get("name"):
+            self.games[app_id] = cached["name"]
+            return cached["name"]
+        return None
+
+    def _fetch_game_name(self, app_id):
+        """Interroge le Steam Store pour un jeu. Retourne son nom, ou None (introuvable ou erreur)"""
+        url = "https://store.steampowered.com/api/appdetails"
 
         try:
-            response = requests.get(url)
+            response = self.http_client.get(url, params={"appids": app_id})
             response.raise_for_status()
             data = response.json()
 
-            if str(app_id) in data and data[str(app_id)]['success']:
-                game_data = data[str(app_id)]['data']
-                self.games[app_id] = game_data['name']
-                return game_data['name']
-            else:
-                return f"Game with id {app_id} not found"
+            if data and str(app_id) in data and data[str(app_id)]['success']:
+                return data[str(app_id)]['data']['name']
+            logger.info(f"Jeu {app_id} introuvable sur le Steam Store")
 
-        except requests.RequestException as e:
-            return f"Error : {e}"
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Nom du jeu {app_id} indisponible : {e}")
+        return None
 
     def get_all_games_names(self):
         """Récupère les noms de tous les jeux dans la liste des ID"""
-        for game_id in self.games_id:
-            self.get_game_name(game_id)
+        self.resolve_game_names(self.games_id)
 
 
 # ==================== TESTS ====================
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable
+
+RARITY_LEVELS = ('common', 'uncommon', 'rare', 'very_rare', 'ultra_rare')
+
+
+def rarity_level(percentage):
+    """Rarity bucket of an achievement from its global unlock percentage"""
+    if percentage >= 50:
+        return 'common'
+    elif percentage >= 25:
+        return 'uncommon'
+    elif percentage >= 10:
+        return 'rare'
+    elif percentage >= 5:
+        return 'very_rare'
+    else:
+        return 'ultra_rare'
+
+
+def empty_rarity_breakdown():
+    return dict.fromkeys(RARITY_LEVELS, 0)
+
+
+@dataclass
+class GameSummary:
+    """Per-game aggregates, rebuilt only when the achievement list or the local unlock file changes"""
+    total: int = 0
+    unlocked: int = 0                             # achievements of the list unlocked locally
+    rarity_breakdown: Dict[str, int] = field(default_factory=empty_rarity_breakdown)
+    unlocked_rarity_breakdown: Dict[str, int] = field(default_factory=empty_rarity_breakdown)
+    rarest_unlock: Optional[Dict[str, Any]] = None  # {'key', 'name', 'percentage'}
+
+    @property
+    def completion_percentage(self):
+        return round(self.unlocked / self.total * 100, 1) if self.total else 0
+
+
+def build_game_summary(achievements, unlocked_keys, local_only_keys: Iterable[str] = ()):
+    """One pass over a game's achievements.
+    local_only_keys: listed by the local file but unknown to the source (counted at 0 %, never the rarest unlock)"""
+    summary = GameSummary()
+
+    for key, data in achievements.items():
+        percentage = data.get('percentage', 0)
+        level = rarity_level(percentage)
+        summary.rarity_breakdown[level] += 1
+        if key not in unlocked_keys:
+            continue
+
+        summary.unlocked += 1
+        summary.unlocked_rarity_breakdown[level] += 1
+        if summary.rarest_unlock is None or percentage < summary.rarest_unlock['percentage']:
+            summary.rarest_unlock = {'key': key, 'name': data.get('displayName', key), 'percentage': percentage}
+
+    for key in local_only_keys:
+        if key in achievements:
+            continue
+        level = rarity_level(0)
+        summary.rarity_breakdown[level] += 1
+        if key in unlocked_keys:
+            summary.unlocked_rarity_breakdown[level] += 1
+            summary.unlocked += 1
+
+    summary.total = sum(summary.rarity_breakdown.values())
+    return summary
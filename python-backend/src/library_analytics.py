@@ -0,0 +1,232 @@
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from log_manager import get_logger
+
+logger = get_logger(__name__)
+
+TIMELINE_INTERVALS = {'day': 86400, 'week': 7 * 86400}
+
+
+class AchievementTable:
+    """Tous les succès de la bibliothèque en colonnes (array, ou NumPy si installé) :
+    pourcentage, débloqué, date de déblocage, index du jeu.
+    Les ordres utiles aux requêtes sont calculés une fois à la construction :
+    les requêtes se contentent ensuite de découper ces colonnes."""
+
+    def __init__(self, games, segments):
+        self.games = games  # [{'app_id', 'name', 'team', 'location'}], index = colonne "game"
+        self.keys = []
+        self.names = []
+        percentage = array('d')
+        unlocked = array('b')
+        unlock_time = array('q')
+        game = array('i')
+        self.game_totals = array('i')
+        self.game_unlocked = array('i')
+
+        for index, segment in enumerate(segments):
+            self.keys.extend(segment['keys'])
+            self.names.extend(segment['names'])
+            percentage.extend(segment['percentage'])
+            unlocked.extend(segment['unlocked'])
+            unlock_time.extend(segment['unlock_time'])
+            game.extend(array('i', [index]) * len(segment['keys']))
+            self.game_totals.append(len(segment['keys']))
+            self.game_unlocked.append(sum(segment['unlocked']))
+
+        if np is not None:
+            self.percentage = np.frombuffer(percentage, dtype=np.float64)
+            self.unlocked = np.frombuffer(unlocked, dtype=np.int8).astype(bool)
+            self.unlock_time = np.frombuffer(unlock_time, dtype=np.int64)
+            self.game = np.frombuffer(game, dtype=np.int32)
+
+            unlocked_rows = np.flatnonzero(self.unlocked)
+            self.rarest_order = unlocked_rows[np.argsort(self.percentage[unlocked_rows], kind='stable')]
+            self.unlock_times_sorted = np.sort(self.unlock_time[self.unlocked & (self.unlock_time > 0)])
+        else:
+            self.percentage = percentage
+            self.unlocked = unlocked
+            self.unlock_time = unlock_time
+            self.game = game
+
+            self.rarest_order = array('i', sorted((row for row in range(len(unlocked)) if unlocked[row]),
+                                                  key=percentage.__getitem__))
+            self.unlock_times_sorted = array('q', sorted(unlock_time[row] for row in range(len(unlocked))
+                                                         if unlocked[row] and unlock_time[row] > 0))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def overview(self):
+        total = len(self)
+        unlocked = sum(self.game_unlocked)
+        return {
+            'games': len(self.games),
+            'achievements': total,
+            'unlocked': unlocked,
+            'completion_percentage': round(unlocked / total * 100, 1) if total else 0
+        }
+
+    def rarest_unlocked(self, limit=10):
+        """Les limit succès débloqués les plus rares de la bibliothèque"""
+        results = []
+        for row in self.rarest_order[:limit].tolist():
+            game = self.games[int(self.game[row])]
+            results.append({
+                'app_id': game['app_id'],
+                'game': game['name'],
+                'key': self.keys[row],
+                'name': self.names[row],
+                'percentage': float(self.percentage[row]),
+                'unlock_time': int(self.unlock_time[row])
+            })
+        return results
+
+    def completion_by(self, group_by='team'):
+        """Complétion agrégée par équipe ou par emplacement (une boucle sur les jeux, pas sur les succès)"""
+        groups = {}
+        for index, game in enumerate(self.games):
+            group = groups.setdefault(game.get(group_by) or 'Unknown', {'games': 0, 'achievements': 0, 'unlocked': 0})
+            group['games'] += 1
+            group['achievements'] += self.game_totals[index]
+            group['unlocked'] += self.game_unlocked[index]
+
+        for group in groups.values():
+            group['completion_percentage'] = (round(group['unlocked'] / group['achievements'] * 100, 1)
+                                              if group['achievements'] else 0)
+        return groups
+
+    def timeline(self, interval='month'):
+        """Histogramme des déblocages datés : [{'start': timestamp, 'count': n}] (UTC).
+        Seuls les seaux non vides sont rendus : la taille dépend du nombre de dates distinctes, pas de l'étendue"""
+        times = self.unlock_times_sorted
+        if not len(times):
+            return []
+
+        if np is not None:
+            if interval == 'month':
+                starts = times.astype('datetime64[s]').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+            else:
+                starts = times - times % TIMELINE_INTERVALS[interval]
+            values, counts = np.unique(starts, return_counts=True)
+            return [{'start': start, 'count': count} for start, count in zip(values.tolist(), counts.tolist())]
+
+        # Dates triées : les seaux arrivent dans l'ordre, leurs bornes ne sont calculées qu'une fois chacun
+        buckets = []
+        end = None
+        for timestamp in times:
+            if end is None or timestamp >= end:
+                start, end = _bucket_bounds(timestamp, interval)
+                buckets.append({'start': start, 'count': 0})
+            buckets[-1]['count'] += 1
+        return buckets
+
+
+def _bucket_bounds(timestamp, interval):
+    """[début, fin) du seau (UTC) contenant timestamp"""
+    if interval == 'month':
+        start = datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(day=1, hour=0, minute=0, second=0,
+                                                                           microsecond=0)
+        end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        return int(start.timestamp()), int(end.timestamp())
+    step = TIMELINE_INTERVALS[interval]
+    start = timestamp - timestamp % step
+    return start, start + step
+
+
+class LibraryAnalytics:
+    """Vue transversale de la bibliothèque. Chaque jeu contribue un segment de colonnes,
+    reconstruit seulement quand ses enregistrements de succès (date de création) ou son fichier local changent ;
+    la table est réassemblée au plus toutes les refresh_interval secondes."""
+
+    def __init__(self, achievement_parser, game_detector, refresh_interval=5.0):
+        self.achievement_parser = achievement_parser
+        self.game_detector = game_detector
+        self.refresh_interval = refresh_interval
+
+        self.segments = {}  # app_id -> (version des enregistrements, LocalAchievementFile, segment)
+        self.library_version = None  # version de la liste des jeux (noms, équipes) au dernier assemblage
+        self.table = AchievementTable([], [])
+        self.missing_games = 0  # jeux détectés dont les succès n'ont jamais été chargés
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+
+    def get_table(self, force=False):
+        """Table à jour (à refresh_interval près) ; n'interroge jamais le réseau"""
+        with self.lock:
+            now = time.monotonic()
+            if force or self.refreshed_at is None or now - self.refreshed_at >= self.refresh_interval:
+                self._refresh()
+                self.refreshed_at = now
+            return self.table
+
+    def _refresh(self):
+        parser = self.achievement_parser
+        # Lue avant l'instantané : un nom résolu entre les deux relance simplement un assemblage au tour suivant
+        library_version = self.game_detector.get_library_version()
+        games_sources = self.game_detector.get_games_snapshot()
+        # Liste des jeux modifiée (nom résolu en arrière-plan, jeu déplacé) : lignes des jeux à refaire
+        changed = library_version != self.library_version
+        self.library_version = library_version
+        missing = 0
+
+        for app_id in list(self.segments):
+            if app_id not in games_sources:
+                del self.segments[app_id]
+                changed = True
+
+        for app_id, game_info in games_sources.items():
+            if app_id not in parser.achievement_files and game_info.get('path'):
+                parser.check_achievements_file(game_info['path'], app_id)
+            local_file = None
+            if app_id in parser.achievement_files:
+                local_file = parser.load_local_file(parser.achievement_files[app_id])
+
+            # Segment inchangé : ni lecture ni décodage des enregistrements du cache
+            version = parser.get_achievements_version(app_id)
+            cached = self.segments.get(app_id)
+            if version is not None and cached and cached[0] == version and cached[1] is local_file:
+                continue
+
+            source = parser.get_cached_achievements_source(app_id)
+            if source is None:
+                missing += 1
+                if self.segments.pop(app_id, None) is not None:
+                    changed = True
+                continue
+
+            self.segments[app_id] = (version, local_file, self._build_segment(source, local_file))
+            changed = True
+
+        self.missing_games = missing
+        if changed or self.refreshed_at is None:
+            app_ids = [app_id for app_id in games_sources if app_id in self.segments]
+            games = [{'app_id': app_id,
+                      'name': games_sources[app_id].get('name') or f"Game {app_id}",
+                      'team': games_sources[app_id].get('team', 'Unknown'),
+                      'location': games_sources[app_id].get('location', '')} for app_id in app_ids]
+            self.table = AchievementTable(games, [self.segments[app_id][2] for app_id in app_ids])
+            logger.info(f"Table d'analyse reconstruite : {len(self.table)} succès, {len(games)} jeux")
+
+    def _build_segment(self, source, local_file):
+        unlocked_keys = self.achievement_parser.get_unlocked_keys(local_file)
+        unlocks = local_file.unlocks if local_file is not None else {}
+
+        segment = {'keys': [], 'names': [], 'percentage': array('d'), 'unlocked': array('b'),
+                   'unlock_time': array('q')}
+        for key, data in source.items():
+            is_unlocked = key in unlocked_keys
+            segment['keys'].append(key)
+            segment['names'].append(data.get('displayName', key))
+            segment['percentage'].append(float(data.get('percentage', 0) or 0))
+            segment['unlocked'].append(is_unlocked)
+            segment['unlock_time'].append(int(unlocks.get(key, {}).get('earned_time', 0) or 0) if is_unlocked else 0)
+        return segment
@@ -0,0 +1,166 @@
+import configparser
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+
+
+@dataclass
+class LocalAchievementFile:
+    """Result of one parse of a local achievements.json / achievements.ini file"""
+    path: str
+    format: str                                   # 'json' or 'ini'
+    unlocks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    count: Optional[int] = None                   # [SteamAchievements] Count (ini only)
+    index_keys: List[str] = field(default_factory=list)  # numeric keys of [SteamAchievements] (ini only)
+    sections: int = 0                             # number of INI sections (ini only)
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self):
+        """Readable and non-empty (an INI file needs at least one section)"""
+        if self.error is not None:
+            return False
+        return self.format != 'ini' or self.sections > 0
+
+
+def get_file_format(file_path):
+    """Return 'json' or 'ini' from the file extension, None otherwise"""
+    extension = os.path.splitext(file_path)[1].lower()
+    return {'.json': 'json', '.ini': 'ini'}.get(extension)
+
+
+def parse_local_file(file_path):
+    """Read and parse an achievement file once, returning a LocalAchievementFile (never raises)"""
+    result = LocalAchievementFile(path=file_path, format=get_file_format(file_path) or 'unknown')
+
+    try:
+        if result.format == 'json':
+            _parse_json(file_path, result)
+        elif result.format == 'ini':
+            _parse_ini(file_path, result)
+        else:
+            result.error = "Unsupported achievement file format"
+    except (configparser.Error, OSError, UnicodeDecodeError, ValueError) as e:
+        result.unlocks = {}
+        result.error = str(e) or type(e).__name__
+
+    return result
+
+
+def _parse_json(file_path, result):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Achievement JSON root is not an object")
+
+    for ach_id, ach_data in data.items():
+        if not isinstance(ach_data, dict) or not ach_data.get('earned', False):
+            continue
+        result.unlocks[ach_id] = {
+            'earned': True,
+            'earned_time': ach_data.get('earned_time', 0)
+        }
+
+
+class UnsupportedIniSyntax(Exception):
+    """Input outside the emulator INI dialect handled by parse_ini_fast"""
+
+
+def _parse_ini(file_path, result):
+    try:
+        parse_ini_fast(file_path, result)
+    except UnsupportedIniSyntax:
+        # Malformed or unusual input: configparser decides (and reports errors) exactly as before
+        result.unlocks, result.count, result.index_keys, result.sections = {}, None, [], 0
+        parse_ini_configparser(file_path, result)
+
+
+def parse_ini_fast(file_path, result):
+    """Single streaming pass over the emulator dialect
+    ([section] / Achieved= / UnlockTime= / [SteamAchievements] Count=), filling result directly.
+    Raises UnsupportedIniSyntax for anything configparser would read differently or reject."""
+    seen_sections = set()
+    section = None
+    values = None
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped[0] in '#;':
+                continue
+            if line[0] in ' \t':
+                raise UnsupportedIniSyntax("indented or continuation line")
+
+            if stripped[0] == '[':
+                if stripped[-1] != ']' or len(stripped) < 3:
+                    raise UnsupportedIniSyntax(f"malformed section header: {stripped}")
+                if values is not None:
+                    _store_ini_section(result, section, values)
+
+                section = stripped[1:-1]
+                if section in seen_sections or section == 'DEFAULT':
+                    raise UnsupportedIniSyntax(f"duplicate or DEFAULT section: {section}")
+                seen_sections.add(section)
+                values = {}
+                continue
+
+            if values is None:
+                raise UnsupportedIniSyntax("key outside of a section")
+
+            # Same rule as configparser: split on the first '=' or ':'
+            delimiter = stripped.find('=')
+            colon = stripped.find(':')
+            if colon != -1 and (delimiter == -1 or colon < delimiter):
+                delimiter = colon
+            key = stripped[:delimiter].rstrip().lower() if delimiter > 0 else ''
+            if not key or key in values:
+                raise UnsupportedIniSyntax(f"malformed or duplicate key: {stripped}")
+
+            value = stripped[delimiter + 1:].lstrip()
+            if '%' in value:
+                raise UnsupportedIniSyntax("interpolation syntax")
+            values[key] = value
+
+    if values is not None:
+        _store_ini_section(result, section, values)
+    result.sections = len(seen_sections)
+
+
+def _store_ini_section(result, section, values):
+    if section == 'SteamAchievements':
+        count = values.get('count')
+        if count and count.isascii() and count.isdigit():
+            result.count = int(count)
+        result.index_keys = [key for key in values if key.isdigit()]
+        return
+
+    achieved = values.get('achieved')
+    if achieved is not None:
+        result.unlocks[section] = {
+            'earned': achieved == '1',
+            'earned_time': int(values.get('unlocktime', 0))
+        }
+
+
+def parse_ini_configparser(file_path, result):
+    """Reference path through configparser, used as fallback for input the fast parser rejects"""
+    config = configparser.ConfigParser()
+    config.read(file_path, encoding='utf-8')
+    result.sections = len(config.sections())
+
+    for section in config.sections():
+        if section == 'SteamAchievements':
+            count = config[section].get('Count')
+            if count and count.isascii() and count.isdigit():
+                result.count = int(count)
+            result.index_keys = [key for key in config[section] if key.isdigit()]
+            continue
+
+        achieved = config[section].get('Achieved')
+        unlock_time = config[section].get('UnlockTime', 0)
+        if achieved is not None:
+            result.unlocks[section] = {
+                'earned': achieved == '1',
+                'earned_time': int(unlock_time)
+            }
@@ -12,8 +12,9 @@ os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(level=logging.INFO)
 
 # Crée un handler de rotation
+# delay=True : le fichier n'est ouvert qu'au premier message, pas à l'import
 file_handler = RotatingFileHandler(
-    LOG_FILE, maxBytes=2 * 1024 * 1024, backupCount=5, encoding='utf-8'
+    LOG_FILE, maxBytes=2 * 1024 * 1024, backupCount=5, encoding='utf-8', delay=True
 )
 formatter = logging.Formatter('[%(asctime)s] %(levelname)s %(name)s: %(message)s')
 file_handler.setFormatter(formatter)
@@ -1,6 +1,11 @@
 # main.py
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import hashlib
+import queue
+import threading
+from concurrent.futures import as_completed
 import sys
 import os
 from log_manager import get_logger
@@ -11,55 +16,117 @@ logger = get_logger(__name__)
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from achievement_parser import AchievementParser
-from game_detector import GameDetector
+from components import Components
+from achievement_watcher import END_OF_STREAM
+from game_summary import rarity_level
+from response_pipeline import encode_json, iter_json_document
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() via encode_json : orjson si installé, sortie compacte (clés non triées)"""
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj, default=self.default), mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for Electron frontend
 
-# Initialize components
-achievement_parser = AchievementParser()
-game_detector = GameDetector()
+# Composants créés à la première utilisation : l'import de main.py ne fait aucune I/O
+components = Components()
+
+
+@app.before_request
+def start_background_refresher():
+    """Crée et démarre le rafraîchisseur dans le processus qui sert les requêtes (pas dans celui du reloader)"""
+    if request.endpoint != 'health':
+        components.ensure("background_refresher")
+
+
+@app.after_request
+def compress_response(response):
+    """gzip / brotli selon Accept-Encoding au-dessus du seuil configuré (sauf /api/health, sans composant)"""
+    if request.endpoint == 'health':
+        return response
+    return components.response_compressor.compress_response(response, request.accept_encodings)
 
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    """
+    GET /api/health
+    Répond dès que le serveur écoute, sans créer de composant (attente de démarrage du shell Electron)
+    """
+    return jsonify({
+        'success': True,
+        'ready': components.is_created('background_refresher')
+    })
+
 
 @app.route('/api/games', methods=['GET'])
 def get_games():
     """
-    GET /api/games
-    Retourne la liste des jeux détectés
+    GET /api/games?stream=true
+    Retourne la liste des jeux détectés ; avec stream=true, la liste est sérialisée au fil de l'eau
     """
     try:
-        # ✅ UTILISE LES BONNES MÉTHODES !
-        game_detector.scan_all_locations()  # 1. Scan les jeux
-        game_detector.get_all_games_names()  # 2. Récupère les noms
+        # Scan incrémental : seuls les dossiers modifiés depuis le dernier appel sont relistés ;
+        # les noms inconnus sont résolus en arrière-plan (jeu "pending" en attendant)
+        components.game_detector.scan_all_locations()
+
+        # Validateur calculé avant la construction : si l'état change pendant celle-ci,
+        # le client aura au pire une réponse complète de plus, jamais un 304 périmé
+        games_sources = components.game_detector.get_games_snapshot()
+        versions = {app_id: components.achievement_parser.get_game_version(app_id, game_info.get('path'))
+                    for app_id, game_info in games_sources.items()}
+        etag = make_etag(components.game_detector.get_library_version(), list(versions.items()))
+        if etag_matches(etag):
+            return not_modified(etag)
 
         game_list = []
 
+        # Succès locaux + total obtenable, en parallèle et avec un délai global :
+        # les jeux hors délai reviennent avec pending=True et seront complets au prochain appel
+        enrichment = components.enrichment_pipeline.enrich(list(games_sources))
+
         # ✅ UTILISE games_sources qui contient tout !
-        for app_id, game_info in game_detector.games_sources.items():
-            # Recherche du nombre d'achievements obtenus
-            local_achievements_count = achievement_parser.get_local_achievements_count(app_id)
-            # Récupère le nombre total d'achievements obtenables (même logique que test ligne 500+)
-            achievements = achievement_parser.get_best_achievements_auto(app_id)
-            total_obtenable_achievements = len(achievements) if achievements else 0
+        for app_id, game_info in games_sources.items():
             game_data = {
                 'app_id': app_id,
-                'name': game_info.get('name', f"Game {app_id}"),
+                'name': game_info.get('name') or f"Game {app_id}",
                 'path': game_info.get('path', ''),
                 'team': game_info.get('team', 'Unknown'),
                 'location': game_info.get('location', ''),
-                'local_achievements_count': local_achievements_count,
-                'total_obtenable_achievements': total_obtenable_achievements,
+                'local_achievements_count': enrichment[app_id]['local_achievements_count'],
+                'total_obtenable_achievements': enrichment[app_id]['total_obtenable_achievements'],
+                'pending': enrichment[app_id]['pending'] or not game_info.get('name'),
+                'stale': components.achievement_parser.is_data_stale(app_id),
                 'has_api_data': False
             }
             game_list.append(game_data)
 
-        return jsonify({
-            'success': True,
-            'games': game_list,
-            'total_games': len(game_list)
-        })
+        pending_games = sum(1 for game in game_list if game['pending'])
+        if request.args.get('stream', 'false').lower() == 'true':
+            response = stream_json({
+                'success': True,
+                'total_games': len(game_list),
+                'pending_games': pending_games
+            }, 'games', game_list)
+        else:
+            response = jsonify({
+                'success': True,
+                'games': game_list,
+                'total_games': len(game_list),
+                'pending_games': pending_games
+            })
+        # Réponse partielle (jeux en cours, échec, enregistrement absent) : pas de validateur,
+        # le prochain appel doit la reconstruire au lieu de recevoir un 304
+        settled = (not pending_games
+                   and not any(entry.get('failed') for entry in enrichment.values())
+                   and all(has_all_records(version) for version in versions.values()))
+        return with_etag(response, etag) if settled else response
 
     except Exception as e:
         logger.error(f"Erreur dans /api/games : {e}", exc_info=True)
@@ -72,8 +139,8 @@ def get_games():
 @app.route('/api/games/<app_id>/achievements', methods=['GET'])
 def get_game_achievements(app_id):
     """
-    GET /api/games/{app_id}/achievements
-    Retourne tous les succès d'un jeu avec leur statut
+    GET /api/games/{app_id}/achievements?stream=true
+    Retourne tous les succès d'un jeu avec leur statut ; avec stream=true, la liste est sérialisée au fil de l'eau
     """
     try:
         # Get parameters
@@ -82,80 +149,105 @@ def get_game_achievements(app_id):
         sort_by = request.args.get('sort', 'percentage')  # percentage, name, unlocked
         limit = request.args.get('limit', type=int)
 
-        # Get achievements data
-        achievements = achievement_parser.get_best_achievements_auto(app_id)
+        version = components.achievement_parser.get_game_version(app_id)
+        etag = make_etag(version, include_unlocked, include_locked, sort_by, limit)
+        if etag_matches(etag):
+            return not_modified(etag)
 
-        if not achievements:
+        game_achievements = build_game_achievements(app_id, include_unlocked, include_locked, sort_by, limit)
+        if game_achievements is None:
             return jsonify({
                 'success': False,
                 'error': f'No achievements found for game {app_id}'
             }), 404
 
-        # Get local progress if available
-        local_progress = {}
-        if app_id in achievement_parser.achievement_files:
-            file_path = achievement_parser.achievement_files[app_id]
-            local_achievements = achievement_parser.parse_achievement_file(file_path, app_id)
-            local_progress = {ach_id: ach_data for ach_id, ach_data in local_achievements.items()}
-        # Format achievements for frontend
-        formatted_achievements = []
-
-        for ach_key, ach_data in achievements.items():
-            # Check if unlocked locally
-            is_unlocked = ach_key in local_progress
-            unlock_time = local_progress.get(ach_key, {}).get('earned_time', None)
-
-            # Filter based on parameters
-            if not include_unlocked and is_unlocked:
-                continue
-            if not include_locked and not is_unlocked:
-                continue
-
-            formatted_ach = {
-                'key': ach_key,
-                'name': ach_data.get('displayName', ach_key),
-                'description': ach_data.get('description', 'No description'),
-                'percentage': ach_data.get('percentage', 0),
-                'icon': ach_data.get('icon', ''),
-                'icon_gray': ach_data.get('icongray', ''),
-                'unlocked': is_unlocked,
-                'unlock_time': unlock_time,
-                'rarity': get_rarity_level(ach_data.get('percentage', 0)),
-                'source': ach_data.get('source', 'UNKNOWN')
-            }
-            formatted_achievements.append(formatted_ach)
+        if request.args.get('stream', 'false').lower() == 'true':
+            achievements = game_achievements.pop('achievements')
+            response = stream_json({'success': True, **game_achievements}, 'achievements', achievements)
+        else:
+            response = jsonify({'success': True, **game_achievements})
+        # Enregistrement absent (échec de récupération) : pas de validateur, sinon le 304 figerait l'échec
+        return with_etag(response, etag) if has_all_records(version) else response
 
-        # Sort achievements
-        if sort_by == 'percentage':
-            formatted_achievements.sort(key=lambda x: x['percentage'])
-        elif sort_by == 'name':
-            formatted_achievements.sort(key=lambda x: x['name'])
-        elif sort_by == 'unlocked':
-            formatted_achievements.sort(key=lambda x: (not x['unlocked'], x['name']))
+    except Exception as e:
+        logger.error(f"Erreur dans /api/games/<app_id>/achievements : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-        # Apply limit
-        if limit:
-            formatted_achievements = formatted_achievements[:limit]
 
-        # Calculate stats
-        total_achievements = len(achievements)
-        unlocked_count = len([ach for ach in formatted_achievements if ach['unlocked']])
+@app.route('/api/achievements:batch', methods=['POST'])
+def get_achievements_batch():
+    """
+    POST /api/achievements:batch
+    Corps JSON : {"app_ids": [...], "unlocked", "locked", "sort", "limit", "stream"}
+    (unlocked, locked, stream : booléens JSON ; limit : entier > 0) ; 400 si un champ est invalide
+    Résout tous les jeux en parallèle et retourne une seule réponse ;
+    avec "stream": true (ou Accept: application/x-ndjson), une ligne NDJSON par jeu dès qu'il est prêt
+    """
+    try:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({
+                'success': False,
+                'error': 'body must be a JSON object'
+            }), 400
+
+        app_ids = body.get('app_ids')
+        if not isinstance(app_ids, list) or not app_ids:
+            return jsonify({
+                'success': False,
+                'error': 'app_ids must be a non-empty list'
+            }), 400
 
+        # Un seul calcul par jeu même si l'id est répété
+        app_ids = list(dict.fromkeys(str(app_id) for app_id in app_ids))
+        if len(app_ids) > components.batch_max_app_ids:
+            return jsonify({
+                'success': False,
+                'error': f'Too many app_ids (max {components.batch_max_app_ids})'
+            }), 400
+
+        limit = body.get('limit')
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+            return jsonify({
+                'success': False,
+                'error': 'limit must be a positive integer'
+            }), 400
+
+        # Booléens JSON stricts : la chaîne "false" ne doit pas valoir True
+        flags = {}
+        for name, default in (('unlocked', True), ('locked', True), ('stream', False)):
+            flags[name] = body.get(name, default)
+            if not isinstance(flags[name], bool):
+                return jsonify({
+                    'success': False,
+                    'error': f'{name} must be a boolean'
+                }), 400
+
+        options = (flags['unlocked'], flags['locked'], body.get('sort', 'percentage'), limit)
+        stream = flags['stream'] or request.accept_mimetypes.best == 'application/x-ndjson'
+
+        futures = {components.batch_executor.submit(build_batch_entry, app_id, options): app_id for app_id in app_ids}
+
+        if stream:
+            def generate():
+                for future in as_completed(futures):
+                    yield encode_json(future.result()) + b"\n"
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        results = {futures[future]: future.result() for future in as_completed(futures)}
         return jsonify({
             'success': True,
-            'app_id': app_id,
-            'achievements': formatted_achievements,
-            'stats': {
-                'total': total_achievements,
-                'unlocked': unlocked_count,
-                'locked': total_achievements - unlocked_count,
-                'completion_percentage': round((unlocked_count / total_achievements) * 100,
-                                               1) if total_achievements > 0 else 0
-            }
+            'games': [results[app_id] for app_id in app_ids],
+            'total_games': len(app_ids),
+            'failed_games': sum(1 for entry in results.values() if not entry['success'])
         })
 
     except Exception as e:
-        logger.error(f"Erreur dans /api/games/<app_id>/achievements : {e}", exc_info=True)
+        logger.error(f"Erreur dans /api/achievements:batch : {e}", exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -165,54 +257,49 @@ def get_game_achievements(app_id):
 @app.route('/api/games/<app_id>/stats', methods=['GET'])
 def get_game_stats(app_id):
     """
-    GET /api/games/{app_id}/stats
-    Retourne les statistiques d'un jeu
+    GET /api/games/{app_id}/stats?completed=false
+    Retourne les statistiques d'un jeu ; completed=false omet la table completed_achievements
     """
     try:
-        # Scan les jeux et leurs fichiers d'achievements
-        game_detector.scan_all_locations()
-        game_detector.get_all_games_names()
-        for detected_app_id, game_info in game_detector.games_sources.items():
-            game_path = game_info.get('path', '')
-            if game_path:
-                achievement_parser.check_achievements_file(game_path, detected_app_id)
-
-        achievements = achievement_parser.get_best_achievements_auto(app_id)
-        if not achievements:
+        # Recherche ciblée : seul le dossier et le fichier de succès de ce jeu sont touchés
+        game_info = components.game_detector.find_game(app_id)
+        if game_info:
+            components.achievement_parser.check_achievements_file(game_info['path'], app_id)
+
+        # Agrégats matérialisés : recalculés seulement si les succès ou le fichier local ont changé
+        summary = components.achievement_parser.get_game_summary(app_id)
+        if not summary.total:
             return jsonify({
                 'success': False,
                 'error': f'No data found for game {app_id}'
             }), 404
 
-        unlocked_count = achievement_parser.get_local_achievements_count(app_id)
-        total_achievements = len(achievements)
-
-        app_id_str = str(app_id)
-        completed_achievements = {}
-        if app_id_str in achievement_parser.achievement_files:
-            file_path = achievement_parser.achievement_files[app_id_str]
-            completed_achievements = achievement_parser.parse_achievement_file(file_path)
-
-        rarity_stats = {'common': 0, 'uncommon': 0, 'rare': 0, 'very_rare': 0, 'ultra_rare': 0}
-        unlocked_rarity_stats = {'common': 0, 'uncommon': 0, 'rare': 0, 'very_rare': 0, 'ultra_rare': 0}
-        for ach_key, ach_data in achievements.items():
-            percentage = ach_data.get('percentage', 0)
-            rarity = achievement_parser.get_rarity_level(percentage)
-            rarity_stats[rarity] += 1
-            # unlocked_rarity_breakdown laissé inchangé pour l'instant
+        unlocked_count = components.achievement_parser.get_local_achievements_count(app_id)
+        total_achievements = summary.total
+
+        stats = {
+            'total_achievements': total_achievements,
+            'unlocked_achievements': unlocked_count,
+            'locked_achievements': total_achievements - unlocked_count,
+            'completion_percentage': round((unlocked_count / total_achievements) * 100, 1) if total_achievements > 0 else 0,
+            'rarity_breakdown': summary.rarity_breakdown,
+            'unlocked_rarity_breakdown': summary.unlocked_rarity_breakdown,
+            'rarest_unlock': summary.rarest_unlock
+        }
+
+        # Table complète des succès débloqués (la plus grosse partie de la réponse), sauf si completed=false
+        if request.args.get('completed', 'true').lower() == 'true':
+            app_id_str = str(app_id)
+            completed_achievements = {}
+            if app_id_str in components.achievement_parser.achievement_files:
+                file_path = components.achievement_parser.achievement_files[app_id_str]
+                completed_achievements = components.achievement_parser.parse_achievement_file(file_path)
+            stats['completed_achievements'] = completed_achievements
 
         return jsonify({
             'success': True,
             'app_id': app_id,
-            'stats': {
-                'total_achievements': total_achievements,
-                'unlocked_achievements': unlocked_count,
-                'locked_achievements': total_achievements - unlocked_count,
-                'completion_percentage': round((unlocked_count / total_achievements) * 100, 1) if total_achievements > 0 else 0,
-                'rarity_breakdown': rarity_stats,
-                'unlocked_rarity_breakdown': unlocked_rarity_stats,
-                'completed_achievements': completed_achievements
-            }
+            'stats': stats
         })
     except Exception as e:
         logger.error(f"Erreur dans /api/games/<app_id>/stats : {e}", exc_info=True)
@@ -222,6 +309,129 @@ def get_game_stats(app_id):
         }), 500
 
 
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics_overview():
+    """
+    GET /api/analytics
+    Vue d'ensemble de la bibliothèque (jeux dont les succès sont déjà chargés)
+    """
+    try:
+        table = components.library_analytics.get_table()
+        return jsonify({
+            'success': True,
+            'overview': table.overview(),
+            'missing_games': components.library_analytics.missing_games
+        })
+    except Exception as e:
+        logger.error(f"Erreur dans /api/analytics : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/analytics/rarest', methods=['GET'])
+def get_analytics_rarest():
+    """
+    GET /api/analytics/rarest?limit=10
+    Succès débloqués les plus rares, tous jeux confondus
+    """
+    try:
+        limit = max(0, request.args.get('limit', 10, type=int))
+        return jsonify({
+            'success': True,
+            'achievements': components.library_analytics.get_table().rarest_unlocked(limit)
+        })
+    except Exception as e:
+        logger.error(f"Erreur dans /api/analytics/rarest : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/analytics/completion', methods=['GET'])
+def get_analytics_completion():
+    """
+    GET /api/analytics/completion?group_by=team|location
+    Complétion agrégée par équipe ou par emplacement
+    """
+    try:
+        group_by = request.args.get('group_by', 'team')
+        if group_by not in ('team', 'location'):
+            return jsonify({
+                'success': False,
+                'error': 'group_by must be team or location'
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'group_by': group_by,
+            'groups': components.library_analytics.get_table().completion_by(group_by)
+        })
+    except Exception as e:
+        logger.error(f"Erreur dans /api/analytics/completion : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/analytics/timeline', methods=['GET'])
+def get_analytics_timeline():
+    """
+    GET /api/analytics/timeline?interval=day|week|month
+    Histogramme des déblocages dans le temps (UTC), seaux non vides uniquement
+    """
+    try:
+        interval = request.args.get('interval', 'month')
+        if interval not in ('day', 'week', 'month'):
+            return jsonify({
+                'success': False,
+                'error': 'interval must be day, week or month'
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'interval': interval,
+            'timeline': components.library_analytics.get_table().timeline(interval)
+        })
+    except Exception as e:
+        logger.error(f"Erreur dans /api/analytics/timeline : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    GET /api/events
+    Flux Server-Sent Events : pousse les succès débloqués / perdus dès qu'un fichier de succès change
+    """
+    subscriber = components.achievement_watcher.subscribe()
+
+    def generate():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is END_OF_STREAM:
+                    # Abonné trop lent, déconnecté : fin du flux, EventSource se reconnecte
+                    return
+                yield f"event: {event['type']}\ndata: {encode_json(event).decode('utf-8')}\n\n"
+        finally:
+            components.achievement_watcher.unsubscribe(subscriber)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/system/cache', methods=['GET'])
 def get_cache_stats():
     """
@@ -229,7 +439,7 @@ def get_cache_stats():
     Retourne les statistiques du cache
     """
     try:
-        stats = achievement_parser.cache_manager.get_cache_stats()
+        stats = components.achievement_parser.cache_manager.get_cache_stats()
         return jsonify({
             'success': True,
             'cache': stats
@@ -249,7 +459,7 @@ def clear_cache():
     Vide le cache
     """
     try:
-        achievement_parser.cache_manager.clear_cache()
+        components.achievement_parser.cache_manager.clear_cache()
         return jsonify({
             'success': True,
             'message': 'Cache cleared successfully'
@@ -262,29 +472,170 @@ def clear_cache():
         }), 500
 
 
-def get_rarity_level(percentage):
-    """Helper function to determine rarity based on unlock percentage"""
-    if percentage >= 50:
-        return 'common'
-    elif percentage >= 25:
-        return 'uncommon'
-    elif percentage >= 10:
-        return 'rare'
-    elif percentage >= 5:
-        return 'very_rare'
-    else:
-        return 'ultra_rare'
+@app.route('/api/system/http', methods=['GET'])
+def get_http_stats():
+    """
+    GET /api/system/http
+    Retourne les métriques du client HTTP par hôte (requêtes, essais, 429, latence, disjoncteur)
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'hosts': components.achievement_parser.http_client.get_metrics()
+        })
+    except Exception as e:
+        logger.error(f"Erreur dans /api/system/http : {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def stream_json(fields, list_key, items):
+    """Réponse {**fields, list_key: [items...]} sérialisée au fil de l'eau, compressée à la volée
+    si le client l'accepte (compress_response ne touche pas aux flux)"""
+    compressor = components.response_compressor
+    encoding = compressor.choose_encoding(request.accept_encodings)
+    chunks = compressor.stream(iter_json_document(fields, list_key, items), encoding)
+    response = Response(stream_with_context(chunks), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def make_etag(*versions):
+    """Validateur (ETag) dérivé des versions de la bibliothèque / des jeux, sans construire la réponse.
+    Envoyé comme validateur faible : les corps identité, gzip/brotli et stream=true sont équivalents
+    mais pas identiques octet pour octet"""
+    return hashlib.blake2b(repr(versions).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def etag_matches(etag):
+    """If-None-Match contient ce validateur (comparaison faible, comme l'exige If-None-Match)"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def has_all_records(game_version):
+    """False si un enregistrement du cache manque dans get_game_version() (récupération échouée ou pas encore faite)"""
+    return None not in game_version[0]
+
+
+def not_modified(etag):
+    """304 sans corps : le client réutilise sa copie"""
+    response = Response(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    response.set_etag(etag, weak=True)
+    # Toujours revalider (If-None-Match) avant de réutiliser la copie en cache
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def build_game_achievements(app_id, include_unlocked=True, include_locked=True, sort_by='percentage', limit=None):
+    """Succès d'un jeu formatés pour le frontend (filtre, tri, limite) ; None si aucun succès connu.
+    Partagé par /api/games/<app_id>/achievements et /api/achievements:batch"""
+    achievements = components.achievement_parser.get_best_achievements_auto(app_id)
+    if not achievements:
+        return None
+
+    # Get local progress if available
+    parser = components.achievement_parser
+    local_file = None
+    if app_id in parser.achievement_files:
+        local_file = parser.load_local_file(parser.achievement_files[app_id])
+    local_progress = local_file.unlocks if local_file is not None else {}
+    # Succès obtenus uniquement (les sections INI listent aussi Achieved=0), comme GameSummary et les analyses
+    unlocked_keys = parser.get_unlocked_keys(local_file)
+    # Format achievements for frontend
+    formatted_achievements = []
+
+    for ach_key, ach_data in achievements.items():
+        # Check if unlocked locally
+        is_unlocked = ach_key in unlocked_keys
+        unlock_time = local_progress.get(ach_key, {}).get('earned_time', None) if is_unlocked else None
+
+        # Filter based on parameters
+        if not include_unlocked and is_unlocked:
+            continue
+        if not include_locked and not is_unlocked:
+            continue
+
+        formatted_ach = {
+            'key': ach_key,
+            'name': ach_data.get('displayName', ach_key),
+            'description': ach_data.get('description', 'No description'),
+            'percentage': ach_data.get('percentage', 0),
+            'icon': ach_data.get('icon', ''),
+            'icon_gray': ach_data.get('icongray', ''),
+            'unlocked': is_unlocked,
+            'unlock_time': unlock_time,
+            'rarity': rarity_level(ach_data.get('percentage', 0)),
+            'source': ach_data.get('source', 'UNKNOWN')
+        }
+        formatted_achievements.append(formatted_ach)
+
+    # Sort achievements
+    if sort_by == 'percentage':
+        formatted_achievements.sort(key=lambda x: x['percentage'])
+    elif sort_by == 'name':
+        formatted_achievements.sort(key=lambda x: x['name'])
+    elif sort_by == 'unlocked':
+        formatted_achievements.sort(key=lambda x: (not x['unlocked'], x['name']))
+
+    # Apply limit
+    if limit:
+        formatted_achievements = formatted_achievements[:limit]
+
+    # Calculate stats
+    total_achievements = len(achievements)
+    unlocked_count = len([ach for ach in formatted_achievements if ach['unlocked']])
+
+    return {
+        'app_id': app_id,
+        'stale': components.achievement_parser.is_data_stale(app_id),
+        'achievements': formatted_achievements,
+        'stats': {
+            'total': total_achievements,
+            'unlocked': unlocked_count,
+            'locked': total_achievements - unlocked_count,
+            'completion_percentage': round((unlocked_count / total_achievements) * 100,
+                                           1) if total_achievements > 0 else 0
+        }
+    }
+
+
+def build_batch_entry(app_id, options):
+    """Entrée de /api/achievements:batch pour un jeu (les erreurs restent locales au jeu)"""
+    try:
+        game_achievements = build_game_achievements(app_id, *options)
+    except Exception as e:
+        logger.error(f"Erreur dans /api/achievements:batch pour {app_id} : {e}", exc_info=True)
+        return {'success': False, 'app_id': app_id, 'error': str(e)}
+
+    if game_achievements is None:
+        return {'success': False, 'app_id': app_id, 'error': f'No achievements found for game {app_id}'}
+    return {'success': True, **game_achievements}
 
 
 if __name__ == '__main__':
     print("🚀 Starting Achievement Tracker API...")
     print("📋 Available endpoints:")
+    print("   GET  /api/health                    - Liveness check (no component created)")
     print("   GET  /api/games                     - List all detected games")
     print("   GET  /api/games/{id}/achievements   - Get achievements for a game")
     print("   GET  /api/games/{id}/stats          - Get statistics for a game")
+    print("   GET  /api/events                    - Stream achievement changes (SSE)")
     print("   GET  /api/system/cache              - Get cache statistics")
     print("   DELETE /api/system/cache            - Clear cache")
-    print("\n🌐 Server running on http://localhost:5000")
+    print("\n🌐 Server running on http://localhost:5000 (dev mode; production: python serve.py)")
     logger.info("API démarrée sur http://localhost:5000")
 
+    # Préchauffe les composants en arrière-plan dans le processus servant les requêtes :
+    # /api/health répond tout de suite, les premières requêtes trouvent les composants prêts
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        threading.Thread(target=components.warm_up, name="warm-up", daemon=True).start()
+
     app.run(debug=True, host='localhost', port=5000)
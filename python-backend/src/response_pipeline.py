@@ -0,0 +1,116 @@
+import gzip
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/plain', 'text/html'}
+
+
+def encode_json(obj, default=None):
+    """Sérialise en JSON compact (bytes UTF-8) : orjson si installé, sinon le module json.
+    Les clés non-chaînes (entiers) sont converties comme le fait json"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # entiers hors 64 bits, etc. : l'encodeur standard sait faire
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def iter_json_document(fields, list_key, items, batch_size=100):
+    """Document {**fields, list_key: [items...]} produit morceau par morceau :
+    la liste (éventuellement un générateur) n'est jamais sérialisée d'un seul bloc"""
+    head = encode_json(fields)
+    yield head[:-1] + (b',' if fields else b'') + encode_json(list_key) + b':['
+
+    separator = b''
+    batch = []
+    for item in items:
+        batch.append(encode_json(item))
+        if len(batch) >= batch_size:
+            yield separator + b','.join(batch)
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + b','.join(batch)
+    yield b']}'
+
+
+class ResponseCompressor:
+    """Compression des réponses selon Accept-Encoding : brotli (si installé) puis gzip,
+    seulement au-dessus de min_size octets (en dessous, l'en-tête coûte plus qu'il ne rapporte)"""
+
+    def __init__(self, min_size=1024, gzip_level=1, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(min_size=config.get("compress_min_size", 1024),
+                   gzip_level=config.get("gzip_level", 1),
+                   brotli_quality=config.get("brotli_quality", 4))
+
+    def choose_encoding(self, accept_encodings):
+        """'br', 'gzip' ou None d'après request.accept_encodings (objet Accept de werkzeug)"""
+        if brotli is not None and accept_encodings.quality('br') > 0:
+            return 'br'
+        if accept_encodings.quality('gzip') > 0:
+            return 'gzip'
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_response(self, response, accept_encodings):
+        """Compresse sur place une réponse déjà construite (hors flux, 304, ou déjà encodée)"""
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = self.choose_encoding(accept_encodings)
+        if encoding is None or len(data) < self.min_size:
+            return response
+
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def stream(self, chunks, encoding):
+        """Compresse un flux au fil de l'eau : chaque morceau est vidé (flush) dès qu'il est produit"""
+        if encoding is None:
+            yield from chunks
+            return
+
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            for chunk in chunks:
+                output = compressor.process(chunk) + compressor.flush()
+                if output:
+                    yield output
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # format gzip
+            for chunk in chunks:
+                output = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if output:
+                    yield output
+            yield compressor.flush()
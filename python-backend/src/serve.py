@@ -0,0 +1,46 @@
+"""
+Point d'entrée production de l'API : serveur WSGI multi-thread, sans debug ni reloader.
+waitress si installé (pip install waitress), sinon le serveur werkzeug en mode threaded.
+
+Un seul processus : l'index des jeux, les caches mémoire, la surveillance des fichiers et les
+flux SSE sont partagés par tous les threads (les composants sont sûrs en accès concurrent).
+
+Utilisation :
+    python python-backend/src/serve.py [--host HOST] [--port PORT] [--threads N]
+"""
+import argparse
+import threading
+
+from main import app, components, logger
+
+
+def serve(host, port, threads):
+    # Préchauffe les composants pendant que le serveur commence à écouter
+    threading.Thread(target=components.warm_up, name="warm-up", daemon=True).start()
+
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve is not None:
+        logger.info(f"API (waitress, {threads} threads) sur http://{host}:{port}")
+        waitress_serve(app, host=host, port=port, threads=threads)
+    else:
+        logger.info(f"API (werkzeug threaded) sur http://{host}:{port}")
+        app.run(host=host, port=port, threaded=True, debug=False, use_reloader=False)
+
+
+def main():
+    server_config = components.section("server")
+    parser = argparse.ArgumentParser(description="Achievement Tracker API (production)")
+    parser.add_argument("--host", default=server_config.get("host", "localhost"))
+    parser.add_argument("--port", type=int, default=server_config.get("port", 5000))
+    parser.add_argument("--threads", type=int, default=server_config.get("threads", 16))
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuts pour lesquels un nouvel essai a du sens
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Hôte considéré hors service : la requête échoue immédiatement sans partir sur le réseau"""
+
+
+class TokenBucket:
+    """Limiteur de débit : rate jetons par seconde, rafale de capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton ; retourne le temps attendu"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Ouvert après threshold échecs consécutifs (ou sur demande du serveur, cf. open_for) ;
+    laisse passer un essai une fois le délai écoulé"""
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.retry_at = None  # instant (monotonic) du prochain essai autorisé quand le circuit est ouvert
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.retry_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() >= self.retry_at else "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.retry_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_progress = False
+            if self.failures >= self.threshold:
+                self.retry_at = time.monotonic() + self.cooldown
+
+    def open_for(self, duration):
+        """Ouvre le circuit pour au moins duration secondes (Retry-After trop long pour attendre)"""
+        with self.lock:
+            self.trial_in_progress = False
+            retry_at = time.monotonic() + duration
+            self.retry_at = retry_at if self.retry_at is None else max(self.retry_at, retry_at)
+
+
+class SteamHttpClient:
+    """Client HTTP partagé par AchievementParser et GameDetector :
+    pool de connexions keep-alive, limiteur par hôte, backoff exponentiel avec jitter
+    (respecte Retry-After), disjoncteur par hôte et métriques par hôte.
+    Un Retry-After plus long que backoff_max n'est pas attendu : l'appel échoue tout de suite
+    et le disjoncteur de l'hôte reste ouvert pendant la durée demandée."""
+
+    def __init__(self, timeout=10, max_retries=3, pool_size=16, backoff_base=0.5, backoff_max=30.0,
+                 rate_limits=None, breaker_threshold=5, breaker_cooldown=60.0):
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # host -> (jetons par seconde, rafale)
+        self.rate_limits = rate_limits or {}
+        self.buckets = {}
+        self.breakers = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        steam_api_config = config_manager.get("steam_api", {})
+        http_config = config_manager.get("http", {})
+        return cls(
+            timeout=steam_api_config.get("timeout", 10),
+            max_retries=steam_api_config.get("max_retries", 3),
+            pool_size=http_config.get("pool_size", 16),
+            backoff_base=http_config.get("backoff_base", 0.5),
+            backoff_max=http_config.get("backoff_max", 30.0),
+            rate_limits=http_config.get("rate_limits", {
+                "api.steampowered.com": [10, 20],
+                "store.steampowered.com": [1, 10],
+                "steamdb.info": [1, 3]
+            }),
+            breaker_threshold=http_config.get("breaker_threshold", 5),
+            breaker_cooldown=http_config.get("breaker_cooldown", 60.0)
+        )
+
+    def _host_state(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+                self.metrics[host] = {"requests": 0, "successes": 0, "failures": 0, "retries": 0,
+                                      "rate_limited": 0, "circuit_rejections": 0,
+                                      "latency_total": 0.0, "latency_max": 0.0, "throttle_wait": 0.0}
+                if host in self.rate_limits:
+                    rate, burst = self.rate_limits[host]
+                    self.buckets[host] = TokenBucket(rate, burst)
+            return self.buckets.get(host), self.breakers[host], self.metrics[host]
+
+    @staticmethod
+    def _retry_after(response):
+        """Délai demandé par l'en-tête Retry-After (secondes ou date HTTP), None s'il est absent ou illisible"""
+        if response is None:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Délai avant le prochain essai : Retry-After tel quel si fourni, sinon backoff exponentiel avec jitter"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record(self, metrics, **deltas):
+        """Met à jour les compteurs d'un hôte (partagés par tous les threads)"""
+        with self.lock:
+            for name, delta in deltas.items():
+                metrics[name] += delta
+
+    def _record_latency(self, metrics, latency):
+        with self.lock:
+            metrics["latency_total"] += latency
+            metrics["latency_max"] = max(metrics["latency_max"], latency)
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """GET avec limitation, nouveaux essais et disjoncteur.
+        Retourne la dernière réponse (y compris 4xx/5xx) ; lève requests.RequestException
+        si aucune réponse n'a pu être obtenue (CircuitOpenError si l'hôte est coupé)."""
+        host = urlsplit(url).netloc.lower()
+        bucket, breaker, metrics = self._host_state(host)
+
+        # Le disjoncteur compte les appels (essais épuisés), pas chaque essai
+        if not breaker.allow():
+            self._record(metrics, circuit_rejections=1)
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        response = None
+        last_error = None
+        retry_after = None
+        for attempt in range(self.max_retries):
+            if attempt:
+                time.sleep(self._backoff_delay(attempt - 1, retry_after))
+                self._record(metrics, retries=1)
+            if bucket is not None:
+                self._record(metrics, throttle_wait=bucket.acquire())
+
+            self._record(metrics, requests=1)
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+            except requests.RequestException as e:
+                last_error = e
+            finally:
+                self._record_latency(metrics, time.perf_counter() - start)
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                self._record(metrics, successes=1)
+                return response
+
+            self._record(metrics, failures=1, rate_limited=int(response is not None and response.status_code == 429))
+
+            retry_after = self._retry_after(response)
+            if retry_after is not None and retry_after > self.backoff_max:
+                # Trop long pour bloquer l'appelant : échec immédiat, hôte coupé le temps demandé
+                breaker.open_for(retry_after)
+                return response
+
+        breaker.record_failure()
+        if response is not None:
+            return response
+        raise last_error
+
+    def get_metrics(self):
+        """Métriques par hôte (latence moyenne calculée) et état des disjoncteurs"""
+        with self.lock:
+            snapshot = {host: dict(metrics) for host, metrics in self.metrics.items()}
+        result = {}
+        for host, metrics in snapshot.items():
+            metrics["latency_avg"] = metrics["latency_total"] / metrics["requests"] if metrics["requests"] else 0.0
+            metrics["circuit"] = self.breakers[host].state
+            result[host] = metrics
+        return result
+
@@ -0,0 +1,168 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Tuple
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+
+# (api name from data-sort, name cell text, percentage cell text), all stripped
+SteamDbRow = Tuple[str, str, str]
+
+ROW_CLASS = 'app'
+NAME_CELL_CLASS = 'span6'
+PERCENTAGE_CELL_CLASS = 'span2'
+
+# Raw-text blocks and comments (up to the end of a truncated page) are skipped while looking for the first row,
+# like the tokenizer does
+ROW_START_PATTERN = re.compile(
+    r"""<(script|style)\b.*?(?:</\1\s*>|\Z)|<!--.*?(?:-->|\Z)|<tr\b((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.IGNORECASE | re.DOTALL)
+ROW_CLASS_PATTERN = re.compile(r'\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+
+
+def _classes(value):
+    return (value or '').split()
+
+
+class SteamDbStatsExtractor(HTMLParser):
+    """Incremental tokenizer keeping only the tr.app rows of a SteamDB stats page.
+    Same selection as the former BeautifulSoup code (first td.span6 / td.span2 of each row),
+    without building a DOM. Feed it str chunks, then close() and read rows."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[SteamDbRow] = []
+        self._in_row = False
+        self._nested_rows = 0
+        self._reset_row()
+
+    def _reset_row(self):
+        self._cells = {}      # 'name' / 'percentage' -> list of text chunks
+        self._capturing = {}  # kind -> open <td> depth while its text is captured
+        self._api_name = ''
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            if self._in_row:
+                self._nested_rows += 1
+            elif ROW_CLASS in _classes(dict(attrs).get('class')):
+                self._in_row = True
+                self._reset_row()
+            return
+
+        if not self._in_row or tag != 'td':
+            return
+
+        for kind in self._capturing:
+            self._capturing[kind] += 1
+
+        attributes = dict(attrs)
+        classes = _classes(attributes.get('class'))
+        if NAME_CELL_CLASS in classes and 'name' not in self._cells:
+            self._cells['name'] = []
+            self._capturing['name'] = 1
+            self._api_name = (attributes.get('data-sort') or '').strip()
+        if PERCENTAGE_CELL_CLASS in classes and 'percentage' not in self._cells:
+            self._cells['percentage'] = []
+            self._capturing['percentage'] = 1
+
+    def handle_endtag(self, tag):
+        if not self._in_row:
+            return
+
+        if tag == 'td':
+            for kind in list(self._capturing):
+                self._capturing[kind] -= 1
+                if not self._capturing[kind]:
+                    del self._capturing[kind]
+        elif tag == 'tr':
+            if self._nested_rows:
+                self._nested_rows -= 1
+                return
+            self._in_row = False
+            if 'name' in self._cells and 'percentage' in self._cells:
+                self.rows.append((self._api_name,
+                                  ''.join(self._cells['name']).strip(),
+                                  ''.join(self._cells['percentage']).strip()))
+            self._reset_row()
+
+    def handle_data(self, data):
+        for kind in self._capturing:
+            self._cells[kind].append(data)
+
+    def close(self):
+        super().close()
+        if self._in_row:
+            # Truncated page: the open row ends with the document, as it does in a DOM
+            self._nested_rows = 0
+            self.handle_endtag('tr')
+
+
+def _rows_slice(content):
+    """Bounds of the part of the page holding the tr.app rows: navigation, scripts and footer
+    around the stats table are never tokenized"""
+    for match in ROW_START_PATTERN.finditer(content):
+        if match.group(2) is None:
+            continue
+        class_match = ROW_CLASS_PATTERN.search(match.group(2))
+        if class_match and ROW_CLASS in _classes(next(filter(None, class_match.groups()), '')):
+            end = content.rfind('</tr')
+            if end < content.rfind('<tr'):
+                return match.start(), len(content)  # truncated inside the last row
+            end = content.find('>', end) + 1 if end >= match.start() else len(content)
+            return match.start(), end or len(content)
+    return 0, 0
+
+
+def _extract_rows_html_parser(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    start, end = _rows_slice(content)
+    extractor = SteamDbStatsExtractor()
+    extractor.feed(content[start:end])
+    extractor.close()
+    return extractor.rows
+
+
+def _extract_rows_lxml(content):
+    try:
+        tree = lxml_html.fromstring(content)
+    except Exception:  # lxml.etree.ParserError on empty documents
+        return []
+
+    rows = []
+    for row in tree.iter('tr'):
+        if ROW_CLASS not in _classes(row.get('class')):
+            continue
+        name_cell = percentage_cell = None
+        for cell in row.iter('td'):
+            classes = _classes(cell.get('class'))
+            if name_cell is None and NAME_CELL_CLASS in classes:
+                name_cell = cell
+            if percentage_cell is None and PERCENTAGE_CELL_CLASS in classes:
+                percentage_cell = cell
+        if name_cell is not None and percentage_cell is not None:
+            rows.append(((name_cell.get('data-sort') or '').strip(),
+                         name_cell.text_content().strip(),
+                         percentage_cell.text_content().strip()))
+    return rows
+
+
+def extract_steamdb_rows(content, backend='auto'):
+    """Return the achievement rows of a SteamDB /stats/ page (bytes or str).
+    backend: 'lxml' (if installed), 'html.parser', or 'auto' (lxml when available)"""
+    if backend == 'lxml' or (backend == 'auto' and lxml_html is not None):
+        if lxml_html is not None:
+            return _extract_rows_lxml(content)
+    return _extract_rows_html_parser(content)
+
+
+def parse_percentage(text):
+    """'12.3%' -> 12.3 ; 0.0 when unreadable (same fallback as before)"""
+    try:
+        return float(text.replace('%', ''))
+    except (ValueError, AttributeError):
+        return 0.0
@@ -0,0 +1,22 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Module main avec des composants neufs : cache dans tmp_path, aucun emplacement de jeux"""
+    pytest.importorskip("flask")
+    import main
+    from components import Components
+
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"cache": {"cache_dir": str(tmp_path / "cache")}, "known_locations": {}}))
+    monkeypatch.setattr(main, "components", Components(str(config_file)))
+    yield main
+    if main.components.is_created("background_refresher"):
+        main.components.background_refresher.stop()
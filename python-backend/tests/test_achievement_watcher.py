@@ -0,0 +1,22 @@
+from achievement_watcher import END_OF_STREAM, AchievementWatcher
+
+
+def test_slow_subscriber_is_closed_with_end_of_stream():
+    watcher = AchievementWatcher(achievement_parser=None, game_detector=None)
+    watcher.start = lambda: None  # pas de thread de surveillance : seule la diffusion est testée
+    slow = watcher.subscribe()
+    fast = watcher.subscribe()
+
+    for index in range(slow.maxsize + 1):
+        watcher.publish({'type': 'achievements_changed', 'index': index})
+        while not fast.empty():
+            assert fast.get_nowait()['index'] == index
+
+    assert slow not in watcher.subscribers
+    assert slow.get_nowait() is END_OF_STREAM
+    assert slow.empty()
+
+    # Les autres abonnés continuent de recevoir les événements
+    watcher.publish({'type': 'achievements_changed', 'index': -1})
+    assert fast.get_nowait()['index'] == -1
+    assert slow.empty()
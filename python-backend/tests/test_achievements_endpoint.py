@@ -0,0 +1,57 @@
+import pytest
+
+INI = """[SteamAchievements]
+Count=2
+00000=ACH_WIN
+00001=ACH_RARE
+
+[ACH_WIN]
+Achieved=1
+UnlockTime=1700000000
+
+[ACH_RARE]
+Achieved=1
+UnlockTime=1700000500
+
+[ACH_LOCKED]
+Achieved=0
+UnlockTime=0
+"""
+
+SOURCE = {key: {'displayName': key.title(), 'description': '', 'hidden': 0, 'icon': '', 'icongray': '',
+                'percentage': percentage, 'source': 'STEAMDB'}
+          for key, percentage in (('ACH_WIN', 60.0), ('ACH_RARE', 2.5), ('ACH_LOCKED', 30.0), ('ACH_OTHER', 12.0))}
+
+
+@pytest.fixture
+def game(api, tmp_path):
+    """Jeu 480 en mode gratuit : enregistrement en cache, fichier local avec une section Achieved=0"""
+    parser = api.components.achievement_parser
+    assert parser.steam_api_key is None
+    parser.cache_manager.set_cache("achievements", "480_gratuit", SOURCE, ttl=3600)
+    ini_path = tmp_path / "achievements.ini"
+    ini_path.write_text(INI, encoding='utf-8')
+    parser.achievement_files['480'] = str(ini_path)
+    return api
+
+
+def test_locked_ini_sections_are_not_unlocked(game):
+    response = game.app.test_client().get('/api/games/480/achievements?sort=name')
+    data = response.get_json()
+
+    assert response.status_code == 200
+    unlocked = {ach['key']: ach['unlock_time'] for ach in data['achievements'] if ach['unlocked']}
+    assert unlocked == {'ACH_RARE': 1700000500, 'ACH_WIN': 1700000000}
+    locked = next(ach for ach in data['achievements'] if ach['key'] == 'ACH_LOCKED')
+    assert locked['unlock_time'] is None
+
+
+def test_achievements_endpoint_agrees_with_the_game_summary(game):
+    client = game.app.test_client()
+    summary = game.components.achievement_parser.get_game_summary('480')
+    unlocked_only = client.get('/api/games/480/achievements?locked=false').get_json()
+    locked_only = client.get('/api/games/480/achievements?unlocked=false').get_json()
+
+    assert len(unlocked_only['achievements']) == summary.unlocked == 2
+    assert len(locked_only['achievements']) == summary.total - summary.unlocked == 2
+    assert min(ach['percentage'] for ach in unlocked_only['achievements']) == summary.rarest_unlock['percentage']
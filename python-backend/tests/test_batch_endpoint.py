@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    calls = []
+
+    def fake_entry(app_id, options):
+        calls.append((app_id, options))
+        return {'success': True, 'app_id': app_id, 'achievements': []}
+
+    monkeypatch.setattr(api, 'build_batch_entry', fake_entry)
+    client = api.app.test_client()
+    client.calls = calls
+    return client
+
+
+@pytest.mark.parametrize('body, error', [
+    ([1, 2], 'body must be a JSON object'),
+    ({}, 'app_ids must be a non-empty list'),
+    ({'app_ids': '480'}, 'app_ids must be a non-empty list'),
+    ({'app_ids': [480], 'limit': 0}, 'limit must be a positive integer'),
+    ({'app_ids': [480], 'limit': -3}, 'limit must be a positive integer'),
+    ({'app_ids': [480], 'limit': '10'}, 'limit must be a positive integer'),
+    ({'app_ids': [480], 'limit': True}, 'limit must be a positive integer'),
+    ({'app_ids': [480], 'unlocked': 'false'}, 'unlocked must be a boolean'),
+    ({'app_ids': [480], 'locked': 0}, 'locked must be a boolean'),
+    ({'app_ids': [480], 'locked': None}, 'locked must be a boolean'),
+    ({'app_ids': [480], 'stream': 'true'}, 'stream must be a boolean'),
+])
+def test_invalid_body_is_rejected(client, body, error):
+    response = client.post('/api/achievements:batch', data=json.dumps(body), content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': error}
+    assert not client.calls
+
+
+def test_options_are_passed_through(client):
+    body = {'app_ids': [480, '480', 620], 'unlocked': False, 'locked': True, 'sort': 'name', 'limit': 5}
+    response = client.post('/api/achievements:batch', json=body)
+
+    assert response.status_code == 200
+    assert [game['app_id'] for game in response.get_json()['games']] == ['480', '620']
+    assert sorted(client.calls) == [('480', (False, True, 'name', 5)), ('620', (False, True, 'name', 5))]
+
+
+def test_stream_flag_returns_ndjson(client):
+    response = client.post('/api/achievements:batch', json={'app_ids': [480, 620], 'stream': True})
+
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data().splitlines()]
+    assert sorted(line['app_id'] for line in lines) == ['480', '620']
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from components import Components
+
+
+@pytest.fixture
+def components(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"batch": {"max_workers": 2}}))
+    return Components(str(config_file))
+
+
+def test_ensure_creates_each_component_once(components):
+    assert not components.is_created("batch_executor")
+
+    components.ensure("batch_executor", "config_manager")
+    executor = components.batch_executor
+    components.ensure("batch_executor")
+
+    assert components.is_created("batch_executor") and components.is_created("config_manager")
+    assert components.batch_executor is executor
+    executor.shutdown()
+
+
+def test_ensure_rejects_unknown_names(components):
+    with pytest.raises(AttributeError):
+        components.ensure("background_refresher_typo")
+    with pytest.raises(AttributeError):
+        components.ensure("section")
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from enrichment_pipeline import STEAMDB_HOST, EnrichmentPipeline
+
+
+class FakeParser:
+    """Jeux entièrement en cache : version connue, résumé immédiat, aucun appel réseau"""
+    steam_api_key = None
+
+    def __init__(self, cached=True):
+        self.cached = cached
+        self.summary_calls = 0
+
+    def get_local_achievements_count(self, app_id):
+        return 3
+
+    def get_achievements_version(self, app_id):
+        return (("percentages", 1.0),) if self.cached else None
+
+    def get_game_summary(self, app_id):
+        self.summary_calls += 1
+        return SimpleNamespace(total=10)
+
+
+class InlineExecutor:
+    """Exécute la tâche dans submit : le Future est déjà terminé quand _submit le reçoit"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+def run_with_timeout(function, timeout=5.0):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', function()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "enrich() bloqué"
+    return result['value']
+
+
+def test_enrich_already_finished_future_does_not_deadlock():
+    pipeline = EnrichmentPipeline(FakeParser())
+    pipeline.executor.shutdown()
+    pipeline.executor = InlineExecutor()
+
+    results = run_with_timeout(lambda: pipeline.enrich(['100', '200']))
+
+    assert results['100'] == {'local_achievements_count': 3, 'total_obtenable_achievements': 10, 'pending': False}
+    assert not pipeline.in_flight
+    # Le verrou est libre : un second appel aboutit aussi
+    assert run_with_timeout(lambda: pipeline.enrich(['100']))['100']['pending'] is False
+
+
+def test_enrich_cached_library_with_thread_pool():
+    pipeline = EnrichmentPipeline(FakeParser(), max_workers=4)
+    try:
+        app_ids = [str(app_id) for app_id in range(200)]
+        for _ in range(3):
+            results = run_with_timeout(lambda: pipeline.enrich(app_ids, deadline=5.0))
+            assert all(not data['pending'] for data in results.values())
+        assert not pipeline.in_flight
+    finally:
+        pipeline.shutdown()
+
+
+def test_cached_games_do_not_wait_for_a_host_slot():
+    cached = EnrichmentPipeline(FakeParser(cached=True), host_limits={STEAMDB_HOST: 1})
+    missing = EnrichmentPipeline(FakeParser(cached=False), host_limits={STEAMDB_HOST: 1})
+    try:
+        for pipeline in (cached, missing):
+            pipeline.host_semaphores[STEAMDB_HOST].acquire()  # créneau occupé par un téléchargement
+
+        assert not any(data['pending'] for data in cached.enrich(['1', '2'], deadline=1.0).values())
+        assert all(data['pending'] for data in missing.enrich(['1', '2'], deadline=0.2).values())
+    finally:
+        for pipeline in (cached, missing):
+            pipeline.host_semaphores[STEAMDB_HOST].release()
+            pipeline.shutdown()
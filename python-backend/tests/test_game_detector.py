@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from cache_manager import CacheManager
+from game_detector import GameDetector
+from steam_http import CircuitOpenError
+
+
+class FakeConfig:
+    def __init__(self, base_path, cache_dir):
+        self.known_locations = {"test": {"base_path": str(base_path), "teams": ["CODEX"]}}
+        self.sections = {"cache": {"cache_dir": str(cache_dir), "backend": "sqlite"},
+                         "steam_api": {"name_workers": 4}}
+
+    def get(self, section, default=None):
+        return self.sections.get(section, default)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class ScriptedStore:
+    """Steam Store simulé : chaque appel consomme la réaction suivante (exception ou nom)"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        app_id = params["appids"]
+        if outcome is None:
+            return FakeResponse({app_id: {"success": False}})
+        return FakeResponse({app_id: {"success": True, "data": {"name": outcome}}})
+
+
+def make_detector(tmp_path, store, app_ids=("480",)):
+    for app_id in app_ids:
+        (tmp_path / "games" / "CODEX" / app_id).mkdir(parents=True)
+    config = FakeConfig(tmp_path / "games", tmp_path / "cache")
+    return GameDetector(cache_manager=CacheManager(config), http_client=store, config_manager=config)
+
+
+def scan_and_wait(detector, timeout=5.0):
+    detector.scan_all_locations()
+    deadline = time.monotonic() + timeout
+    while detector.naming_in_progress:
+        assert time.monotonic() < deadline, "résolution des noms bloquée"
+        time.sleep(0.01)
+    return detector.get_games_snapshot()
+
+
+@pytest.mark.parametrize("failure", [requests.ConnectionError("transient"),
+                                     CircuitOpenError("Circuit open for store.steampowered.com"),
+                                     None])
+def test_failed_name_lookup_stays_pending_and_is_retried_later(tmp_path, failure):
+    store = ScriptedStore(failure, "Spacewar")
+    detector = make_detector(tmp_path, store)
+
+    assert scan_and_wait(detector)["480"]["name"] is None
+    assert store.calls == 1
+
+    # Délai de nouvel essai pas écoulé : aucun appel réseau
+    assert scan_and_wait(detector)["480"]["name"] is None
+    assert store.calls == 1
+
+    failures, _ = detector.name_failures["480"]
+    detector.name_failures["480"] = (failures, 0)  # délai écoulé
+    assert scan_and_wait(detector)["480"]["name"] == "Spacewar"
+    assert "480" not in detector.name_failures
+    assert detector.cache_manager.get_cache("games", "480") == {"name": "Spacewar"}
+
+
+def test_retry_delay_grows_with_each_failure(tmp_path):
+    store = ScriptedStore(*[requests.ConnectionError("down")] * 3)
+    detector = make_detector(tmp_path, store)
+
+    delays = []
+    for _ in range(3):
+        before = time.monotonic()
+        scan_and_wait(detector)
+        failures, retry_at = detector.name_failures["480"]
+        delays.append(retry_at - before)
+        detector.name_failures["480"] = (failures, 0)
+
+    assert failures == 3
+    assert delays[0] < delays[1] < delays[2]
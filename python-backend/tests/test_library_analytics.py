@@ -0,0 +1,77 @@
+from array import array
+from datetime import datetime, timezone
+
+from library_analytics import AchievementTable, LibraryAnalytics
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def segment(unlock_times):
+    count = len(unlock_times)
+    return {'keys': [f"ACH_{i}" for i in range(count)], 'names': [f"Achievement {i}" for i in range(count)],
+            'percentage': array('d', [10.0] * count), 'unlocked': array('b', [1] * count),
+            'unlock_time': array('q', unlock_times)}
+
+
+UNLOCKS = [utc(2014, 3, 2, 10), utc(2014, 3, 2, 23, 59), utc(2014, 3, 30), utc(2024, 1, 1, 0, 0, 1), 0]
+
+
+def test_timeline_returns_only_non_empty_buckets():
+    table = AchievementTable([{'app_id': '1', 'name': 'One'}], [segment(UNLOCKS)])
+
+    assert table.timeline('month') == [{'start': utc(2014, 3, 1), 'count': 3}, {'start': utc(2024, 1, 1), 'count': 1}]
+    assert table.timeline('day') == [{'start': utc(2014, 3, 2), 'count': 2}, {'start': utc(2014, 3, 30), 'count': 1},
+                                     {'start': utc(2024, 1, 1), 'count': 1}]
+    weeks = table.timeline('week')
+    assert [bucket['count'] for bucket in weeks] == [2, 1, 1]
+    assert all(bucket['start'] % (7 * 86400) == 0 for bucket in weeks)
+    assert AchievementTable([], []).timeline('day') == []
+
+
+class FakeDetector:
+    def __init__(self, games):
+        self.games = games
+        self.version = 0
+
+    def rename(self, app_id, name):
+        self.games[app_id]['name'] = name
+        self.version += 1
+
+    def get_library_version(self):
+        return 'epoch', self.version
+
+    def get_games_snapshot(self):
+        return {app_id: dict(game) for app_id, game in self.games.items()}
+
+
+class FakeParser:
+    achievement_files = {}
+    get_unlocked_keys = staticmethod(lambda local_file: set())
+
+    def __init__(self):
+        self.source_reads = 0
+
+    def get_achievements_version(self, app_id):
+        return (('percentages', 1.0),)
+
+    def get_cached_achievements_source(self, app_id):
+        self.source_reads += 1
+        return {'ACH_1': {'displayName': 'First', 'percentage': 50.0}}
+
+
+def test_resolved_game_name_reaches_the_table_without_rebuilding_segments():
+    detector = FakeDetector({'480': {'name': None, 'team': 'CODEX', 'location': 'public'}})
+    parser = FakeParser()
+    analytics = LibraryAnalytics(parser, detector)
+
+    assert analytics.get_table(force=True).games[0]['name'] == 'Game 480'
+
+    detector.rename('480', 'Spacewar')
+    table = analytics.get_table(force=True)
+    assert table.games[0]['name'] == 'Spacewar'
+    assert parser.source_reads == 1
+
+    # Rien de changé : la même table est servie
+    assert analytics.get_table(force=True) is table
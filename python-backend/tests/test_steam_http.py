@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from steam_http import CircuitOpenError, SteamHttpClient
+
+
+class StubServer:
+    """Serveur HTTP local : chaque requête consomme la réponse suivante du script
+    (statut, en-têtes) ; 200 {"ok": true} une fois le script épuisé"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.calls.append(time.monotonic())
+                status, headers = stub.script.pop(0) if stub.script else (200, {})
+                body = json.dumps({"ok": status == 200}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.host = f"127.0.0.1:{self.server.server_port}"
+        self.url = f"http://{self.host}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(*script):
+        servers.append(StubServer(*script))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_429_is_retried_until_success(stub):
+    server = stub((429, {}), (503, {}))
+    client = SteamHttpClient(max_retries=3, backoff_base=0.01, backoff_max=0.05)
+
+    response = client.get(server.url)
+
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    assert len(server.calls) == 3
+    metrics = client.get_metrics()[server.host]
+    assert (metrics["requests"], metrics["retries"], metrics["failures"], metrics["rate_limited"],
+            metrics["successes"]) == (3, 2, 2, 1, 1)
+    assert metrics["circuit"] == "closed"
+
+
+def test_retry_after_within_backoff_max_is_waited(stub):
+    server = stub((429, {"Retry-After": "0.3"}))
+    client = SteamHttpClient(max_retries=2, backoff_base=0.001, backoff_max=5.0)
+
+    assert client.get(server.url).status_code == 200
+    assert server.calls[1] - server.calls[0] >= 0.3
+
+
+def test_retry_after_beyond_backoff_max_fails_fast_and_opens_the_breaker(stub):
+    server = stub((429, {"Retry-After": "120"}))
+    client = SteamHttpClient(max_retries=3, backoff_max=1.0)
+
+    start = time.monotonic()
+    response = client.get(server.url)
+    assert response.status_code == 429
+    assert time.monotonic() - start < 1.0
+    assert len(server.calls) == 1
+
+    with pytest.raises(CircuitOpenError):
+        client.get(server.url)
+    assert len(server.calls) == 1
+    metrics = client.get_metrics()[server.host]
+    assert metrics["circuit"] == "open" and metrics["circuit_rejections"] == 1
+
+
+def test_backoff_delay_is_capped():
+    client = SteamHttpClient(backoff_base=0.5, backoff_max=2.0)
+    delays = [client._backoff_delay(attempt) for attempt in range(12) for _ in range(50)]
+    assert all(0 <= delay <= 2.0 for delay in delays)
+    assert max(client._backoff_delay(0) for _ in range(200)) <= 0.5
+    assert client._backoff_delay(10, retry_after=1.5) == 1.5
+
+
+def test_breaker_opens_after_failed_calls_and_recovers(stub):
+    server = stub(*[(503, {})] * 4)
+    client = SteamHttpClient(max_retries=2, backoff_base=0.001, backoff_max=0.01,
+                             breaker_threshold=2, breaker_cooldown=0.2)
+
+    for _ in range(2):
+        assert client.get(server.url).status_code == 503
+    assert len(server.calls) == 4
+    with pytest.raises(CircuitOpenError):
+        client.get(server.url)
+    assert len(server.calls) == 4
+
+    time.sleep(0.25)  # cooldown écoulé : un essai passe et referme le circuit
+    assert client.get(server.url).status_code == 200
+    assert client.get_metrics()[server.host]["circuit"] == "closed"
+    assert client.get(server.url).status_code == 200
+
+
+def test_unreachable_host_raises_and_opens_the_breaker(stub):
+    server = stub()
+    server.close()
+    client = SteamHttpClient(max_retries=2, backoff_base=0.001, backoff_max=0.01, timeout=0.5,
+                             breaker_threshold=1, breaker_cooldown=60.0)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(server.url)
+    with pytest.raises(CircuitOpenError):
+        client.get(server.url)
+
+
+def test_retry_after_header_formats():
+    class Response:
+        def __init__(self, value):
+            self.headers = {} if value is None else {"Retry-After": value}
+
+    in_ten_seconds = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 10))
+    assert SteamHttpClient._retry_after(Response("7")) == 7.0
+    assert 8.0 <= SteamHttpClient._retry_after(Response(in_ten_seconds)) <= 10.0
+    assert SteamHttpClient._retry_after(Response("Thu, 01 Jan 1970 00:00:00 GMT")) == 0.0
+    assert SteamHttpClient._retry_after(Response("soon")) is None
+    assert SteamHttpClient._retry_after(Response(None)) is None
+    assert SteamHttpClient._retry_after(None) is None
@@ -0,0 +1,77 @@
+"""
+Parité de extract_steamdb_rows sur des pages /stats/ sauvegardées (tests/fixtures/steamdb).
+Chaque page.html est comparée à page.rows.json, les lignes produites par le parcours BeautifulSoup
+d'origine ; une page ajoutée sans .rows.json est seulement comparée entre backends.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+import steamdb_stats
+from steamdb_stats import extract_steamdb_rows, parse_percentage
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'steamdb'
+PAGES = sorted(FIXTURES.glob('*.html'))
+
+BACKENDS = ['html.parser', pytest.param('lxml', marks=pytest.mark.skipif(steamdb_stats.lxml_html is None,
+                                                                        reason="lxml non installé"))]
+
+
+def extract_rows_bs4(content):
+    """Parcours d'origine (get_gratuit_achievements avant l'extracteur ciblé)"""
+    soup = BeautifulSoup(content, 'html.parser')
+    rows = []
+    for row in soup.find_all('tr', class_='app'):
+        name_cell = row.find('td', class_='span6')
+        perc_cell = row.find('td', class_='span2')
+        if name_cell and perc_cell:
+            rows.append((name_cell.get('data-sort', '').strip(), name_cell.text.strip(), perc_cell.text.strip()))
+    return rows
+
+
+def expected_rows(page):
+    expected = page.with_suffix('.rows.json')
+    if not expected.exists():
+        if BeautifulSoup is None:
+            pytest.skip(f"{expected.name} absent et bs4 non installé")
+        return extract_rows_bs4(page.read_bytes())
+    with open(expected, encoding='utf-8') as f:
+        return [tuple(row) for row in json.load(f)]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('page', PAGES, ids=lambda page: page.name)
+def test_saved_page_rows(page, backend):
+    content = page.read_bytes()
+    expected = expected_rows(page)
+    assert extract_steamdb_rows(content, backend) == expected
+    assert extract_steamdb_rows(content.decode('utf-8'), backend) == expected
+
+
+@pytest.mark.skipif(BeautifulSoup is None, reason="bs4 non installé")
+@pytest.mark.parametrize('page', PAGES, ids=lambda page: page.name)
+def test_golden_rows_match_beautifulsoup(page):
+    if page.with_suffix('.rows.json').exists():
+        assert expected_rows(page) == extract_rows_bs4(page.read_bytes())
+
+
+@pytest.mark.skipif(BeautifulSoup is None, reason="bs4 non installé")
+def test_truncated_downloads_match_beautifulsoup():
+    # Réponse coupée n'importe où (dans un script, un commentaire, une ligne ou une cellule)
+    content = (FIXTURES / 'app_480_stats.html').read_text(encoding='utf-8')
+    for end in range(0, len(content), 7):
+        truncated = content[:end]
+        assert extract_steamdb_rows(truncated, 'html.parser') == extract_rows_bs4(truncated), f"coupée à {end}"
+
+
+def test_percentages_of_saved_pages():
+    rows = expected_rows(FIXTURES / 'app_480_stats.html')
+    assert [parse_percentage(percentage) for _, _, percentage in rows] == [61.3, 4.86, 12.07, 33.5, 0.42]
+    assert rows[-1][:2] == ('NEW_ACHIEVEMENT_0_4',
+                            'Secret <Achievement> & "Quotes"Hidden achievement: Finish the game with \'style\'.')